@@ -0,0 +1,536 @@
+"""Reproducible load test of the gateway and the services behind it.
+
+Starts the API gateway plus the catalog, shopping, purchase and online
+services on SQLite databases in a scratch directory, with an in-process
+fakeredis server standing in for Redis. Kafka needs no stand-in: with
+``KAFKA_ENABLED=false`` the services' ``publish_event`` helpers only log.
+Virtual users then replay a weighted traffic mix through the gateway for a
+fixed duration:
+
+* ``browse``  list a catalog page, then open one game
+* ``search``  full-text catalog search
+* ``cart``    add a game to the user's cart
+* ``checkout`` create a purchase and mark it completed
+* ``lobby``   send a lobby chat message over the WebSocket and wait for it
+
+Throughput and p50/p95/p99 latency per endpoint are printed and written to
+a JSON file. Pass ``--compare`` with an earlier result to print the deltas,
+and ``--target`` to load an already running gateway instead.
+
+Requires ``httpx``, ``websockets`` and ``fakeredis`` next to the services'
+own requirements.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import websockets
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SERVICES_ROOT = REPO_ROOT / "services"
+
+# name -> (directory, gateway URL setting, database URL setting)
+BACKENDS = {
+    "game-catalog-service": ("game-catalog-service", "GAME_CATALOG_SERVICE_URL", "GAME_CATALOG_DATABASE_URL"),
+    "shopping-service": ("shopping-service", "SHOPPING_SERVICE_URL", "SHOPPING_DATABASE_URL"),
+    "purchase-service": ("purchase-service", "PURCHASE_SERVICE_URL", "PURCHASE_DATABASE_URL"),
+    "online-service": ("online-service", "ONLINE_SERVICE_URL", "ONLINE_DATABASE_URL"),
+}
+
+# Journey -> relative weight in the default mix.
+DEFAULT_MIX = {"browse": 50, "search": 20, "cart": 15, "checkout": 5, "lobby": 10}
+
+SEARCH_TERMS = ["Sample", "Game 1", "Game 2", "storyline", "thrilling", "Sample Game 4"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _parse_mix(raw: Optional[str]) -> Dict[str, int]:
+    """Parse ``"browse=50,search=20"``; unknown journeys are rejected."""
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown journey {name!r}; choose from {sorted(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Local stack
+# ---------------------------------------------------------------------------
+class Stack:
+    """Gateway and backends as uvicorn subprocesses on local stand-ins."""
+
+    def __init__(self, workdir: Path, catalog_size: int, gateway_env: Dict[str, str]) -> None:
+        self.workdir = workdir
+        self.catalog_size = catalog_size
+        self.gateway_env = gateway_env
+        self.processes: List[subprocess.Popen] = []
+        self.gateway_url = ""
+
+    def _start_redis(self) -> str:
+        from fakeredis import TcpFakeServer
+
+        port = _free_port()
+        server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"redis://127.0.0.1:{port}/0"
+
+    def _spawn(self, name: str, directory: Path, port: int, env: Dict[str, str]) -> str:
+        log = open(self.workdir / f"{name}.log", "wb")
+        self.processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable, "-m", "uvicorn", "app.main:app",
+                    "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+                ],
+                cwd=directory,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        )
+        return f"http://127.0.0.1:{port}"
+
+    @staticmethod
+    def _wait_healthy(url: str, name: str, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.25)
+        raise SystemExit(f"{name} did not become healthy at {url}")
+
+    def start(self) -> str:
+        redis_url = self._start_redis()
+        base_env = {
+            **os.environ,
+            "REDIS_URL": redis_url,
+            "KAFKA_ENABLED": "false",
+            "PYTHONUNBUFFERED": "1",
+        }
+
+        gateway_env = dict(base_env)
+        for name, (directory, url_setting, db_setting) in BACKENDS.items():
+            env = {**base_env, db_setting: f"sqlite:///{self.workdir / name}.db"}
+            service_dir = SERVICES_ROOT / directory
+            if name == "game-catalog-service":
+                # The catalog is the only backend the mix reads pre-existing data from.
+                subprocess.run(
+                    [sys.executable, "-m", "app.seed", "--count", str(self.catalog_size)],
+                    cwd=service_dir,
+                    env=env,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                )
+            url = self._spawn(name, service_dir, _free_port(), env)
+            self._wait_healthy(url, name)
+            gateway_env[url_setting] = url
+
+        gateway_env.update(
+            {
+                # Every virtual user shares one client address.
+                "RATE_LIMIT_PER_MINUTE": "100000000",
+                "RATE_LIMIT_BURST": "100000000",
+                "RATE_LIMIT_CLASSES": "",
+            }
+        )
+        gateway_env.update(self.gateway_env)
+        self.gateway_url = self._spawn(
+            "api-gateway", SERVICES_ROOT / "api-gateway", _free_port(), gateway_env
+        )
+        self._wait_healthy(self.gateway_url, "api-gateway")
+        return self.gateway_url
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.recording = False
+
+    def record(self, endpoint: str, latency: float, status: str, ok: bool) -> None:
+        if not self.recording:
+            return
+        stats = self.endpoints.setdefault(endpoint, EndpointStats())
+        stats.latencies.append(latency)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if not ok:
+            stats.errors += 1
+
+
+class JourneyFailed(Exception):
+    """A step failed; the rest of the journey is skipped."""
+
+
+class VirtualUser:
+    def __init__(
+        self, index: int, base_url: str, client: httpx.AsyncClient, recorder: Recorder,
+        rng: random.Random, game_ids: List[int],
+    ) -> None:
+        self.user_id = f"loadtest-user-{index}"
+        self.base_url = base_url
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.game_ids = game_ids
+        self.cart_id: Optional[int] = None
+        self.lobby_id: Optional[str] = None
+
+    async def call(self, endpoint: str, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as exc:
+            self.recorder.record(endpoint, time.perf_counter() - started, type(exc).__name__, False)
+            raise JourneyFailed(endpoint) from exc
+        ok = response.status_code < 400
+        self.recorder.record(endpoint, time.perf_counter() - started, str(response.status_code), ok)
+        if not ok:
+            raise JourneyFailed(endpoint)
+        return response
+
+    # ------------------------------------------------------------------ setup
+    async def setup(self) -> None:
+        cart = await self.client.post("/api/v1/shopping/cart", json={"user_id": self.user_id})
+        cart.raise_for_status()
+        self.cart_id = cart.json()["id"]
+
+    async def join_lobby(self, lobby_id: str) -> None:
+        response = await self.client.post(
+            f"/api/v1/online/lobbies/{lobby_id}/join", json={"user_id": self.user_id}
+        )
+        response.raise_for_status()
+        self.lobby_id = lobby_id
+
+    # ------------------------------------------------------------------ journeys
+    async def browse(self) -> None:
+        page = self.rng.randint(1, 5)
+        await self.call("GET /catalog/games", "GET", "/api/v1/catalog/games", params={"page": page})
+        await self.call(
+            "GET /catalog/games/{id}", "GET", f"/api/v1/catalog/games/{self.rng.choice(self.game_ids)}"
+        )
+
+    async def search(self) -> None:
+        await self.call(
+            "GET /catalog/games?query",
+            "GET",
+            "/api/v1/catalog/games",
+            params={"query": self.rng.choice(SEARCH_TERMS)},
+        )
+
+    async def cart(self) -> None:
+        game_id = self.rng.choice(self.game_ids)
+        await self.call(
+            "POST /shopping/cart/{id}/items",
+            "POST",
+            f"/api/v1/shopping/cart/{self.cart_id}/items",
+            json={"game_id": str(game_id), "game_name": f"Game {game_id}", "unit_price": 19.99},
+        )
+
+    async def checkout(self) -> None:
+        game_id = self.rng.choice(self.game_ids)
+        purchase = await self.call(
+            "POST /purchases",
+            "POST",
+            "/api/v1/purchases/",
+            json={
+                "user_id": self.user_id,
+                "total_amount": "19.99",
+                "payment_method": "card",
+                "items": [{"game_id": str(game_id), "game_name": f"Game {game_id}", "price": "19.99"}],
+            },
+        )
+        await self.call(
+            "PATCH /purchases/{id}",
+            "PATCH",
+            f"/api/v1/purchases/{purchase.json()['id']}",
+            json={"status": "completed", "payment_id": f"pay-{self.rng.getrandbits(48):x}"},
+        )
+
+    async def lobby(self) -> None:
+        url = self.base_url.replace("http", "ws", 1)
+        url = f"{url}/ws/lobbies/{self.lobby_id}?user_id={self.user_id}"
+        text = f"gg {self.rng.getrandbits(32):x}"
+        started = time.perf_counter()
+        try:
+            async with websockets.connect(url, open_timeout=5) as socket_:
+                connected = time.perf_counter()
+                self.recorder.record("WS connect /ws/lobbies/{id}", connected - started, "101", True)
+                await socket_.send(text)
+                sent = time.perf_counter()
+                await asyncio.wait_for(_await_chat(socket_, text), 5)
+                self.recorder.record("WS chat round trip", time.perf_counter() - sent, "ok", True)
+        except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as exc:
+            self.recorder.record(
+                "WS chat round trip", time.perf_counter() - started, type(exc).__name__, False
+            )
+            raise JourneyFailed("lobby") from exc
+
+
+async def _await_chat(socket_: Any, text: str) -> None:
+    while True:
+        event = json.loads(await socket_.recv())
+        if event.get("type") == "chat" and event.get("message") == text:
+            return
+
+
+async def _prepare(client: httpx.AsyncClient, users: List[VirtualUser]) -> None:
+    for user in users:
+        await user.setup()
+    # Lobbies of four: the first member hosts, the rest join.
+    for start in range(0, len(users), 4):
+        members = users[start:start + 4]
+        response = await client.post(
+            "/api/v1/online/lobbies",
+            json={"host_id": members[0].user_id, "name": f"loadtest lobby {start // 4}", "max_members": 4},
+        )
+        response.raise_for_status()
+        lobby_id = response.json()["id"]
+        members[0].lobby_id = lobby_id
+        for member in members[1:]:
+            await member.join_lobby(lobby_id)
+
+
+async def _game_ids(client: httpx.AsyncClient) -> List[int]:
+    response = await client.get("/api/v1/catalog/games", params={"per_page": 100})
+    response.raise_for_status()
+    ids = [game["id"] for game in response.json()["games"]]
+    if not ids:
+        raise SystemExit("The catalog is empty; seed it or pass --catalog-size")
+    return ids
+
+
+async def run_load(
+    base_url: str, *, users: int, duration: float, warmup: float,
+    mix: Dict[str, int], seed: int, think_time: float,
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        game_ids = await _game_ids(client)
+        virtual_users = [
+            VirtualUser(i, base_url, client, recorder, random.Random(seed * 1_000_003 + i), game_ids)
+            for i in range(users)
+        ]
+        await _prepare(client, virtual_users)
+
+        journeys = list(mix)
+        weights = [mix[name] for name in journeys]
+        stop_at = time.monotonic() + warmup + duration
+
+        async def drive(user: VirtualUser) -> None:
+            while time.monotonic() < stop_at:
+                journey: Callable[[], Any] = getattr(user, user.rng.choices(journeys, weights)[0])
+                try:
+                    await journey()
+                except JourneyFailed:
+                    pass
+                if think_time:
+                    await asyncio.sleep(user.rng.expovariate(1.0 / think_time))
+
+        async def measure() -> float:
+            await asyncio.sleep(warmup)
+            recorder.recording = True
+            started = time.perf_counter()
+            await asyncio.sleep(duration)
+            recorder.recording = False
+            return time.perf_counter() - started
+
+        measured, *_ = await asyncio.gather(measure(), *(drive(user) for user in virtual_users))
+    return recorder, measured
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    endpoints = {}
+    total = errors = 0
+    for name, stats in sorted(recorder.endpoints.items()):
+        ordered = sorted(stats.latencies)
+        total += len(ordered)
+        errors += stats.errors
+        endpoints[name] = {
+            "requests": len(ordered),
+            "errors": stats.errors,
+            "throughput_rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "statuses": stats.statuses,
+        }
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(summary: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    header = f"{'endpoint':<32} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    before = (baseline or {}).get("summary", {}).get("endpoints", {})
+    for name, row in summary["endpoints"].items():
+        print(
+            f"{name:<32} {row['requests']:>7} {row['errors']:>5} {row['throughput_rps']:>8.1f}"
+            f" {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+        old = before.get(name)
+        if old:
+            deltas = [
+                f"{key[:-3]} {100.0 * (row[key] - old[key]) / old[key]:+.1f}%"
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+                if old[key]
+            ]
+            rps = row["throughput_rps"] - old["throughput_rps"]
+            print(f"{'':<32}   vs baseline: rps {rps:+.1f}, " + ", ".join(deltas))
+    print("-" * len(header))
+    print(
+        f"total: {summary['requests']} requests, {summary['errors']} errors, "
+        f"{summary['throughput_rps']:.1f} req/s over {summary['elapsed_seconds']}s"
+    )
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the gateway with a realistic traffic mix.")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users (default: 20)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first (default: 5)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between journeys")
+    parser.add_argument("--mix", help="Journey weights, e.g. 'browse=50,search=20,cart=15,checkout=5,lobby=10'")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic (default: 1)")
+    parser.add_argument("--catalog-size", type=int, default=500, help="Games seeded into the catalog")
+    parser.add_argument("--target", help="Load an already running gateway instead of starting one")
+    parser.add_argument("--workdir", type=Path, help="Keep databases and service logs here")
+    parser.add_argument(
+        "--gateway-env", action="append", default=[], metavar="KEY=VALUE",
+        help="Extra gateway setting for the local stack (repeatable)",
+    )
+    parser.add_argument("--output", type=Path, help="Result file (default: loadtest-results/<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    gateway_env = dict(item.split("=", 1) for item in args.gateway_env)
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    stack: Optional[Stack] = None
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as scratch:
+        if args.workdir:
+            args.workdir.mkdir(parents=True, exist_ok=True)
+            scratch = str(args.workdir)
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            stack = Stack(Path(scratch), args.catalog_size, gateway_env)
+            print(f"Starting local stack in {scratch}...")
+            base_url = stack.start()
+        try:
+            print(f"Running {args.users} users for {args.duration}s (+{args.warmup}s warm-up) against {base_url}")
+            recorder, elapsed = asyncio.run(
+                run_load(
+                    base_url,
+                    users=args.users,
+                    duration=args.duration,
+                    warmup=args.warmup,
+                    mix=mix,
+                    seed=args.seed,
+                    think_time=args.think_time,
+                )
+            )
+        finally:
+            if stack is not None:
+                stack.stop()
+
+    summary = summarize(recorder, elapsed)
+    print_report(summary, baseline)
+
+    started = datetime.now(timezone.utc)
+    output = args.output or REPO_ROOT / "loadtest-results" / f"{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    result = {
+        "created_at": started.isoformat(),
+        "git_revision": _git_revision(),
+        "scenario": {
+            "users": args.users,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "think_time": args.think_time,
+            "mix": mix,
+            "seed": args.seed,
+            "catalog_size": args.catalog_size,
+            "target": args.target,
+            "gateway_env": gateway_env,
+        },
+        "summary": summary,
+    }
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Store page aggregation.
+
+One gateway call replaces the client's serial round trips for a game page:
+catalog details, reviews, the caller's cart/wishlist/ownership state and
+recommendations are fetched concurrently, each under its own deadline. Only
+the game itself is required; any other section that fails or misses its
+deadline is left out and listed under ``degraded``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException, Request
+
+from .auth import identity_headers
+from .core.config import settings
+from .dispatch import dispatch, read_body
+from .metrics import set_labels
+from .routing import routes
+from .upstream import upstreams
+
+logger = logging.getLogger("api_gateway.aggregation")
+
+# Forwarded to every dependency so upstream authorization still applies.
+_FORWARDED_HEADERS = ("authorization", "accept-language", "x-request-id")
+# Route label for this endpoint's upstream metrics.
+_ROUTE = "/api/v1/store/games"
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    name: str
+    service: str
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    # A 404 from the upstream means "nothing there" rather than a failure.
+    empty_on_404: Any = None
+    priority: str = "normal"
+
+
+class SectionFailed(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _sections(game_id: str, user_id: Optional[str]) -> List[Section]:
+    sections = [
+        Section("game", "game-catalog-service", f"/api/v1/catalog/games/{game_id}"),
+        Section(
+            "reviews",
+            "review-service",
+            f"/api/v1/reviews/game/{game_id}",
+            {"limit": settings.AGGREGATE_REVIEW_LIMIT},
+            empty_on_404=[],
+        ),
+    ]
+    if user_id:
+        sections += [
+            Section(
+                "cart",
+                "shopping-service",
+                f"/api/v1/shopping/cart/user/{user_id}",
+                empty_on_404={"items": []},
+            ),
+            Section(
+                "wishlist",
+                "shopping-service",
+                f"/api/v1/shopping/wishlist/user/{user_id}",
+                empty_on_404=[],
+            ),
+            Section(
+                "purchases",
+                "purchase-service",
+                f"/api/v1/purchases/user/{user_id}",
+                empty_on_404=[],
+            ),
+            Section(
+                "recommendations",
+                "recommendation-service",
+                f"/api/v1/recommendation/user/{user_id}",
+                {"limit": settings.AGGREGATE_RECOMMENDATION_LIMIT},
+                empty_on_404=[],
+                priority="low",
+            ),
+        ]
+    return sections
+
+
+def _deadline_for(section: Section) -> float:
+    return settings.AGGREGATE_DEADLINES.get(section.name, settings.AGGREGATE_DEFAULT_DEADLINE)
+
+
+def _error_detail(upstream: httpx.Response) -> str:
+    try:
+        return str(upstream.json()["detail"])
+    except (ValueError, KeyError, TypeError):
+        return upstream.text[:200]
+
+
+async def _fetch(request: Request, section: Section) -> Any:
+    replica_set = routes.table.services.get(section.service)
+    if replica_set is None:
+        raise SectionFailed(503, f"No route for {section.service}")
+    set_labels(_ROUTE, section.service)
+    headers = [
+        (name, request.headers[name]) for name in _FORWARDED_HEADERS if name in request.headers
+    ] + identity_headers(request)
+    timeout = upstreams.timeout_for(_deadline_for(section))
+
+    async def build(client: httpx.AsyncClient) -> httpx.Request:
+        return client.build_request(
+            "GET", section.path, params=section.params, headers=headers, timeout=timeout
+        )
+
+    try:
+        upstream = await read_body(
+            await dispatch(replica_set, build, priority=section.priority)
+        )
+    except HTTPException as e:
+        raise SectionFailed(e.status_code, str(e.detail)) from e
+    if upstream.status_code == 404 and section.empty_on_404 is not None:
+        return section.empty_on_404
+    if upstream.status_code >= 400:
+        raise SectionFailed(upstream.status_code, _error_detail(upstream))
+    try:
+        return upstream.json()
+    except ValueError as e:
+        raise SectionFailed(502, f"Invalid JSON from {section.service}") from e
+
+
+async def _fetch_within_deadline(
+    request: Request, section: Section
+) -> Tuple[Section, Any, Optional[SectionFailed]]:
+    try:
+        data = await asyncio.wait_for(_fetch(request, section), _deadline_for(section))
+    except asyncio.TimeoutError:
+        return section, None, SectionFailed(504, f"{section.name} missed its deadline")
+    except SectionFailed as e:
+        return section, None, e
+    return section, data, None
+
+
+def _contains_game(collections: List[Dict[str, Any]], game_id: str) -> bool:
+    return any(
+        str(item.get("game_id")) == game_id
+        for collection in collections
+        for item in collection.get("items") or []
+    )
+
+
+def _merge(game_id: str, results: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+    document: Dict[str, Any] = {
+        "game": results["game"],
+        "reviews": results.get("reviews"),
+    }
+    if user_id:
+        user: Dict[str, Any] = {"user_id": user_id}
+        if "cart" in results:
+            user["in_cart"] = _contains_game([results["cart"]], game_id)
+        if "wishlist" in results:
+            user["wishlisted"] = _contains_game(results["wishlist"], game_id)
+        if "purchases" in results:
+            completed = [p for p in results["purchases"] if p.get("status") == "completed"]
+            user["owned"] = _contains_game(completed, game_id)
+        document["user"] = user
+        if "recommendations" in results:
+            document["recommendations"] = [
+                recommendation
+                for recommendation in results["recommendations"]
+                if str(recommendation.get("game_id")) != game_id
+            ]
+    return document
+
+
+async def build_store_page(
+    request: Request, game_id: str, user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Fan out to every section concurrently and merge what arrives in time."""
+    outcomes = await asyncio.gather(
+        *(_fetch_within_deadline(request, section) for section in _sections(game_id, user_id))
+    )
+
+    results: Dict[str, Any] = {}
+    degraded: List[str] = []
+    for section, data, error in outcomes:
+        if error is None:
+            results[section.name] = data
+            continue
+        if section.name == "game":
+            status_code = 404 if error.status_code == 404 else 503
+            raise HTTPException(status_code=status_code, detail=error.detail)
+        logger.warning("Store page section %s degraded: %s", section.name, error.detail)
+        degraded.append(section.name)
+
+    document = _merge(game_id, results, user_id)
+    document["degraded"] = degraded
+    return document
@@ -0,0 +1,181 @@
+"""
+Client-side load balancing across upstream replicas.
+
+Each ``*_SERVICE_URL`` setting may list several comma-separated replicas.
+Requests go to the replica with the fewest outstanding requests, chosen by
+power-of-two-choices (or a full least-outstanding scan), skipping replicas
+that fail active health checks or whose circuit breaker is open.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from .circuit_breaker import circuit_breakers
+from .core.config import settings
+
+logger = logging.getLogger("api_gateway.balancer")
+
+
+def parse_replica_urls(raw_value: str) -> List[str]:
+    return [url.strip().rstrip("/") for url in raw_value.split(",") if url.strip()]
+
+
+@dataclass(eq=False, slots=True)
+class Replica:
+    url: str
+    healthy: bool = True
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    consecutive_successes: int = 0
+
+    def mark_probe(self, ok: bool) -> None:
+        if ok:
+            self.consecutive_failures = 0
+            self.consecutive_successes += 1
+            threshold = settings.HEALTH_CHECK_HEALTHY_THRESHOLD
+            if not self.healthy and self.consecutive_successes >= threshold:
+                logger.info("Replica %s is healthy again", self.url)
+                self.healthy = True
+        else:
+            self.consecutive_successes = 0
+            self.consecutive_failures += 1
+            threshold = settings.HEALTH_CHECK_UNHEALTHY_THRESHOLD
+            if self.healthy and self.consecutive_failures >= threshold:
+                logger.warning("Replica %s failed health checks, removing it", self.url)
+                self.healthy = False
+
+
+class ReplicaSet:
+    """The replicas serving one upstream service."""
+
+    def __init__(self, name: str, raw_urls: str) -> None:
+        self.name = name
+        self.replicas = [Replica(url) for url in parse_replica_urls(raw_urls)]
+
+    @property
+    def urls(self) -> List[str]:
+        return [replica.url for replica in self.replicas]
+
+    def _pool(self, exclude: Iterable[Replica] = ()) -> List[Replica]:
+        excluded = set(exclude)
+        candidates = [
+            replica
+            for replica in self.replicas
+            if replica not in excluded and circuit_breakers.get(replica.url).available()
+        ]
+        healthy = [replica for replica in candidates if replica.healthy]
+        # With no healthy replica left, trust the breakers over the probes
+        # rather than failing every request.
+        return healthy or candidates
+
+    def can_pick(self, exclude: Iterable[Replica] = ()) -> bool:
+        return bool(self._pool(exclude))
+
+    def pick(self, exclude: Iterable[Replica] = ()) -> Optional[Replica]:
+        """Choose a replica, or ``None`` if every circuit is open."""
+        pool = self._pool(exclude)
+        if not pool:
+            return None
+        if len(pool) == 1:
+            return pool[0]
+        if settings.LB_STRATEGY == "least_outstanding":
+            return min(pool, key=lambda replica: replica.outstanding)
+        first, second = random.sample(pool, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    def pick_sticky(self, key: str) -> Optional[Replica]:
+        """Rendezvous hashing: a key stays on its replica while that replica is
+        available, and only keys of a lost replica move elsewhere."""
+        return max(
+            self._pool(),
+            key=lambda replica: hashlib.blake2b(
+                f"{key}|{replica.url}".encode(), digest_size=8
+            ).digest(),
+            default=None,
+        )
+
+    def retry_after(self) -> int:
+        return min(
+            (circuit_breakers.get(replica.url).retry_after() for replica in self.replicas),
+            default=1,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "service": self.name,
+            "replicas": [
+                {
+                    "url": replica.url,
+                    "healthy": replica.healthy,
+                    "outstanding": replica.outstanding,
+                    "circuit": circuit_breakers.get(replica.url).state.value,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+class HealthChecker:
+    """Background prober hitting each replica's ``/health`` endpoint."""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._replicas: List[Replica] = []
+        # Own small client: a request pool exhausted under load must not make
+        # healthy replicas look down.
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        # At most one probe per replica is in flight, so no connection cap.
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=32),
+            timeout=settings.HEALTH_CHECK_TIMEOUT,
+        )
+
+    async def _probe(self, client: httpx.AsyncClient, replica: Replica) -> None:
+        try:
+            response = await client.get(replica.url + settings.HEALTH_CHECK_PATH)
+            replica.mark_probe(response.is_success)
+        except httpx.HTTPError:
+            replica.mark_probe(False)
+        except Exception:
+            logger.exception("Health probe of %s failed", replica.url)
+            replica.mark_probe(False)
+
+    async def _run(self) -> None:
+        client = self._client = self._build_client()
+        while True:
+            await asyncio.gather(*(self._probe(client, replica) for replica in self._replicas))
+            await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL)
+
+    def track(self, replica_sets: Iterable[ReplicaSet]) -> None:
+        """Replace the probed replicas, e.g. after the route table reloads."""
+        self._replicas = [
+            replica for replica_set in replica_sets for replica in replica_set.replicas
+        ]
+
+    def start(self, replica_sets: Iterable[ReplicaSet]) -> None:
+        self.track(replica_sets)
+        if self._task is None and settings.HEALTH_CHECK_INTERVAL > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+health_checker = HealthChecker()
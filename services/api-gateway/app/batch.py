@@ -0,0 +1,152 @@
+"""
+Batched API calls.
+
+``POST /api/v1/batch`` takes an array of sub-requests and answers with one
+result per item, in the same order. Each sub-request is replayed through the
+regular proxy pipeline (route policy, auth, rate limits, cache, coalescing,
+hedging) as if the client had sent it with the batch's own headers, so a
+batch is never a way around per-route rules. At most ``BATCH_CONCURRENCY``
+sub-requests of one batch are in flight at a time.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.types import Message
+
+from .core.config import settings
+from .routing import Route, routes
+from .schemas import BatchItem, BatchResult
+
+logger = logging.getLogger("api_gateway.batch")
+
+Handler = Callable[[Request, Route], Awaitable[Response]]
+
+# Request headers a sub-request may not set for itself.
+_RESERVED_HEADERS = frozenset(
+    {"accept-encoding", "authorization", "content-length", "cookie", "host", "transfer-encoding"}
+)
+# Response headers that describe the outer HTTP message, not the item.
+_DROPPED_RESPONSE_HEADERS = frozenset({"content-encoding", "content-length", "set-cookie"})
+
+
+def _sub_request(request: Request, item: BatchItem) -> Request:
+    path, _, query = item.path.partition("?")
+    headers = {
+        name.lower(): value
+        for name, value in request.headers.items()
+        if name.lower() not in ("content-length", "content-type", "transfer-encoding")
+    }
+    headers.update(
+        (name.lower(), value)
+        for name, value in item.headers.items()
+        if name.lower() not in _RESERVED_HEADERS
+    )
+    # Bodies are decoded into the result, so ask upstreams for identity bytes.
+    headers["accept-encoding"] = "identity"
+    body = b""
+    if item.body is not None:
+        body = json.dumps(item.body).encode()
+        headers.setdefault("content-type", "application/json")
+        headers["content-length"] = str(len(body))
+
+    scope = {
+        **request.scope,
+        "method": item.method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "state": {},
+    }
+    sent = False
+
+    async def receive() -> Message:
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def _read_body(response: Response) -> bytes:
+    if isinstance(response, StreamingResponse):
+        chunks = [
+            chunk if isinstance(chunk, bytes) else chunk.encode(response.charset)
+            async for chunk in response.body_iterator
+        ]
+        return b"".join(chunks)
+    return response.body
+
+
+def _decode(body: bytes, content_type: str) -> Any:
+    if not body:
+        return None
+    if content_type.split(";", 1)[0].strip().endswith("json"):
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body.decode("utf-8", errors="replace")
+
+
+def _error(status: int, detail: Any, headers: Optional[Dict[str, str]] = None) -> BatchResult:
+    return BatchResult(status=status, headers=headers or {}, body={"detail": detail})
+
+
+async def _run_one(request: Request, item: BatchItem, handler: Handler) -> BatchResult:
+    """One item's result; its failures never escape into the rest of the batch."""
+    try:
+        sub_request = _sub_request(request, item)
+    except ValueError as e:
+        # e.g. a header value that is not latin-1 encodable
+        return _error(400, f"Invalid sub-request: {e}")
+    route: Optional[Route] = routes.table.match(sub_request.url.path)
+    try:
+        if route is None:
+            raise HTTPException(status_code=404, detail="Service not found")
+        response = await handler(sub_request, route)
+        body = await _read_body(response)
+    except HTTPException as e:
+        return _error(e.status_code, e.detail, e.headers)
+    except httpx.HTTPError as e:
+        # e.g. the upstream dropped a streamed body halfway
+        return _error(502, f"Bad gateway: {e}")
+    except Exception:
+        logger.exception("Batch item %s %s failed", item.method, item.path)
+        return _error(500, "Internal gateway error")
+
+    headers: Dict[str, str] = {}
+    for name, value in response.raw_headers:
+        key = name.decode("latin-1")
+        if key not in _DROPPED_RESPONSE_HEADERS:
+            headers[key] = value.decode("latin-1")
+    return BatchResult(
+        status=response.status_code,
+        headers=headers,
+        body=_decode(body, headers.get("content-type", "")),
+    )
+
+
+async def run_batch(request: Request, items: List[BatchItem], handler: Handler) -> List[BatchResult]:
+    """Run ``items`` through ``handler`` concurrently; results keep their order."""
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch holds at most {settings.BATCH_MAX_REQUESTS} requests",
+        )
+    slots = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(item: BatchItem) -> BatchResult:
+        async with slots:
+            return await _run_one(request, item, handler)
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -0,0 +1,291 @@
+"""
+Shared GET response cache for the gateway.
+
+Entries are stored in two tiers: a bounded in-process LRU in front of Redis,
+so repeated storefront reads are answered without touching the upstream.
+Invalidations are broadcast on a Redis channel; every gateway instance drops
+matching entries from both tiers when a purge event arrives.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
+from fastapi import Request
+from fastapi.responses import Response
+from redis.exceptions import RedisError
+
+from .core.config import settings
+from .core.redis import redis_client
+
+logger = logging.getLogger("api_gateway.cache")
+
+CACHE_KEY_PREFIX = "gwcache:"
+PURGE_CHANNEL = "gateway:cache:purge"
+
+# Request headers that make a response private to the caller.
+_PRIVATE_REQUEST_HEADERS = ("authorization", "cookie")
+# Response headers never replayed from the cache; length and encoding are
+# recomputed because the stored body is the decoded payload.
+_UNCACHED_RESPONSE_HEADERS = frozenset(
+    {
+        "age",
+        "connection",
+        "content-encoding",
+        "content-length",
+        "date",
+        "etag",
+        "keep-alive",
+        "set-cookie",
+        "transfer-encoding",
+        "x-cache",
+    }
+)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    status_code: int
+    body: bytes
+    etag: str
+    stored_at: float
+    expires_at: float
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+
+    def dumps(self) -> bytes:
+        meta = {
+            "status_code": self.status_code,
+            "etag": self.etag,
+            "stored_at": self.stored_at,
+            "expires_at": self.expires_at,
+            "headers": self.headers,
+        }
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResponse":
+        meta, _, body = raw.partition(b"\n")
+        data = json.loads(meta)
+        return cls(
+            status_code=data["status_code"],
+            body=body,
+            etag=data["etag"],
+            stored_at=data["stored_at"],
+            expires_at=data["expires_at"],
+            headers=[tuple(item) for item in data["headers"]],
+        )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    weak = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == weak
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _escape_glob(value: str) -> str:
+    return "".join(f"\\{char}" if char in "*?[]\\" else char for char in value)
+
+
+class ResponseCache:
+    """Two-tier (LRU + Redis) cache of upstream GET responses."""
+
+    def __init__(self) -> None:
+        self._local: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._redis_retry_at = 0.0
+        self._listener: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------ policy
+    @staticmethod
+    def is_cacheable_request(request: Request) -> bool:
+        if request.method != "GET":
+            return False
+        if any(name in request.headers for name in _PRIVATE_REQUEST_HEADERS):
+            return False
+        cache_control = request.headers.get("cache-control", "").lower()
+        return "no-store" not in cache_control
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        vary = "|".join(
+            f"{name}={request.headers.get(name, '')}" for name in settings.CACHE_VARY_HEADERS
+        )
+        digest = hashlib.sha1(f"{request.url.query}#{vary}".encode()).hexdigest()
+        return f"{CACHE_KEY_PREFIX}{request.url.path}|{digest}"
+
+    # ------------------------------------------------------------------ tiers
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, exc: Exception) -> None:
+        logger.warning("Redis response cache unavailable: %s", exc)
+        self._redis_retry_at = time.monotonic() + settings.CACHE_REDIS_RETRY_SECONDS
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > settings.CACHE_LOCAL_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        entry = self._local.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._local.move_to_end(key)
+                return entry
+            self._local.pop(key, None)
+
+        if not self._redis_available():
+            return None
+        try:
+            raw = await redis_client.get(key)
+        except (RedisError, OSError) as exc:
+            self._redis_failed(exc)
+            return None
+        if raw is None:
+            return None
+        entry = CachedResponse.loads(raw)
+        if entry.expires_at <= now:
+            return None
+        self._remember(key, entry)
+        return entry
+
+    async def store(
+        self, key: str, upstream: httpx.Response, ttl: float
+    ) -> Optional[CachedResponse]:
+        """Cache a fully-read upstream response if HTTP semantics allow it."""
+        if upstream.status_code != 200 or "set-cookie" in upstream.headers:
+            return None
+        cache_control = upstream.headers.get("cache-control", "").lower()
+        if "no-store" in cache_control or "private" in cache_control:
+            return None
+
+        body = upstream.content
+        etag = upstream.headers.get("etag")
+        if not etag:
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        now = time.time()
+        entry = CachedResponse(
+            status_code=upstream.status_code,
+            body=body,
+            etag=etag,
+            stored_at=now,
+            expires_at=now + ttl,
+            headers=[
+                (name, value)
+                for name, value in upstream.headers.multi_items()
+                if name.lower() not in _UNCACHED_RESPONSE_HEADERS
+            ],
+        )
+        self._remember(key, entry)
+        if self._redis_available():
+            try:
+                await redis_client.set(key, entry.dumps(), px=max(1, int(ttl * 1000)))
+            except (RedisError, OSError) as exc:
+                self._redis_failed(exc)
+        return entry
+
+    # ------------------------------------------------------------------ responses
+    @staticmethod
+    def respond(entry: CachedResponse, request: Request, *, hit: bool) -> Response:
+        age = str(max(0, int(time.time() - entry.stored_at)))
+        cache_headers = {"ETag": entry.etag, "X-Cache": "HIT" if hit else "MISS", "Age": age}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=cache_headers)
+        response = Response(content=entry.body, status_code=entry.status_code)
+        response.raw_headers = response.raw_headers + [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in entry.headers
+        ]
+        for name, value in cache_headers.items():
+            response.headers[name] = value
+        return response
+
+    # ------------------------------------------------------------------ purging
+    def _purge_local(self, prefixes: Iterable[str]) -> int:
+        targets = tuple(f"{CACHE_KEY_PREFIX}{prefix}" for prefix in prefixes)
+        doomed = [key for key in self._local if key.startswith(targets)]
+        for key in doomed:
+            self._local.pop(key, None)
+        return len(doomed)
+
+    async def _purge_redis(self, prefixes: Iterable[str]) -> None:
+        for prefix in prefixes:
+            pattern = f"{CACHE_KEY_PREFIX}{_escape_glob(prefix)}*"
+            batch: List[bytes] = []
+            async for key in redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                await redis_client.delete(*batch)
+
+    async def _apply_purge(self, prefixes: List[str]) -> None:
+        self._purge_local(prefixes)
+        if self._redis_available():
+            try:
+                await self._purge_redis(prefixes)
+            except (RedisError, OSError) as exc:
+                self._redis_failed(exc)
+
+    async def purge(self, prefixes: List[str]) -> None:
+        """Broadcast a purge of every cached path under ``prefixes``."""
+        # Applied locally first so this instance is consistent even when the
+        # broadcast cannot be delivered.
+        await self._apply_purge(prefixes)
+        try:
+            await redis_client.publish(PURGE_CHANNEL, json.dumps({"prefixes": prefixes}))
+        except (RedisError, OSError) as exc:
+            self._redis_failed(exc)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(PURGE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        prefixes = json.loads(message["data"]).get("prefixes") or []
+                    except (ValueError, AttributeError):
+                        logger.warning("Ignoring malformed purge event: %r", message["data"])
+                        continue
+                    await self._apply_purge([str(prefix) for prefix in prefixes])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as exc:
+                logger.warning("Cache purge listener disconnected: %s", exc)
+                await asyncio.sleep(settings.CACHE_REDIS_RETRY_SECONDS)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.close()
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+
+response_cache = ResponseCache()
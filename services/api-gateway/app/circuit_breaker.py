@@ -0,0 +1,173 @@
+"""
+Per-upstream circuit breakers.
+
+Each upstream keeps a rolling window of call outcomes. The breaker opens when
+either the error rate or the share of slow calls (a latency-percentile
+threshold: a slow-call rate above 5% means p95 is above the slow threshold)
+crosses its limit, fails fast while open, and lets a few probe requests
+through once the cool-down expires (half-open) before closing again.
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Deque, Dict
+
+from .core.config import settings
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class _Outcome:
+    at: float
+    ok: bool
+    latency: float
+    slow: bool
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class CircuitBreaker:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = BreakerState.CLOSED
+        self._window: Deque[_Outcome] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._open_until = 0.0
+        self._consecutive_opens = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    # ------------------------------------------------------------------ window
+    def _prune(self, now: float) -> None:
+        horizon = now - settings.CIRCUIT_WINDOW_SECONDS
+        limit = settings.CIRCUIT_WINDOW_MAX_SAMPLES
+        window = self._window
+        while window and (window[0].at < horizon or len(window) > limit):
+            outcome = window.popleft()
+            self._failures -= not outcome.ok
+            self._slow -= outcome.slow
+
+    def _should_trip(self) -> bool:
+        total = len(self._window)
+        if total < settings.CIRCUIT_MIN_REQUESTS:
+            return False
+        return (
+            self._failures / total >= settings.CIRCUIT_ERROR_RATE
+            or self._slow / total >= settings.CIRCUIT_SLOW_CALL_RATE
+        )
+
+    # ------------------------------------------------------------------ transitions
+    def _open(self, now: float) -> None:
+        self.state = BreakerState.OPEN
+        self._consecutive_opens += 1
+        backoff = settings.CIRCUIT_OPEN_SECONDS * (2 ** (self._consecutive_opens - 1))
+        self._open_until = now + min(backoff, settings.CIRCUIT_MAX_OPEN_SECONDS)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _close(self) -> None:
+        self.state = BreakerState.CLOSED
+        self._consecutive_opens = 0
+        self._window.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def available(self) -> bool:
+        """Like :meth:`allow` but without claiming a half-open probe slot."""
+        if self.state is BreakerState.CLOSED:
+            return True
+        if self.state is BreakerState.OPEN:
+            return time.monotonic() >= self._open_until
+        return self._probes_in_flight < settings.CIRCUIT_HALF_OPEN_PROBES
+
+    def allow(self) -> bool:
+        """Return ``True`` if a call may be sent to the upstream now."""
+        if self.state is BreakerState.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state is BreakerState.OPEN:
+            if now < self._open_until:
+                return False
+            self.state = BreakerState.HALF_OPEN
+        if self._probes_in_flight >= settings.CIRCUIT_HALF_OPEN_PROBES:
+            return False
+        self._probes_in_flight += 1
+        return True
+
+    def record(self, ok: bool, latency: float) -> None:
+        now = time.monotonic()
+        slow = latency >= settings.CIRCUIT_SLOW_CALL_SECONDS
+        if self.state is BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if not ok or slow:
+                self._open(now)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= settings.CIRCUIT_HALF_OPEN_PROBES:
+                self._close()
+            return
+        if self.state is BreakerState.OPEN:
+            # A call admitted before the breaker opened; it no longer counts.
+            return
+
+        self._window.append(_Outcome(at=now, ok=ok, latency=latency, slow=slow))
+        self._failures += not ok
+        self._slow += slow
+        self._prune(now)
+        if self._should_trip():
+            self._open(now)
+
+    def release(self) -> None:
+        """Return a half-open probe slot for a call that never completed."""
+        if self.state is BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self._open_until - time.monotonic()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        latencies = sorted(outcome.latency for outcome in self._window)
+        total = len(latencies)
+        return {
+            "state": self.state.value,
+            "requests": total,
+            "error_rate": round(self._failures / total, 4) if total else 0.0,
+            "slow_call_rate": round(self._slow / total, 4) if total else 0.0,
+            "latency_p50": _percentile(latencies, 0.50),
+            "latency_p95": _percentile(latencies, 0.95),
+            "latency_p99": _percentile(latencies, 0.99),
+            "retry_after": self.retry_after() if self.state is BreakerState.OPEN else 0,
+        }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name)
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry()
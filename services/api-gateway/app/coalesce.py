@@ -0,0 +1,85 @@
+"""
+Single-flight deduplication of identical in-flight upstream GETs.
+
+The first request for a key becomes the leader and performs the upstream
+call; concurrent identical requests await the leader's result instead of
+issuing their own. Followers wait at most ``COALESCE_MAX_WAIT`` seconds
+before falling back to a call of their own.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from fastapi import Request
+
+from .core.config import settings
+
+T = TypeVar("T")
+
+# Credentials are part of the key so callers never share a private response.
+_KEY_HEADERS = ("authorization", "cookie", "accept", "accept-language")
+
+
+def coalesce_key(request: Request) -> str:
+    parts = [request.method, request.url.path, request.url.query]
+    parts.extend(f"{name}={request.headers.get(name, '')}" for name in _KEY_HEADERS)
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def is_coalescable(request: Request) -> bool:
+    """Per-route opt-outs live in the route table's ``coalesce`` policy."""
+    return settings.COALESCE_ENABLED and request.method == "GET"
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Mark leader failures as retrieved when nobody was waiting on them.
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Share one in-flight call per key between concurrent callers."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], max_wait: float) -> T:
+        flight = self._flights.get(key)
+        if flight is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(flight), max_wait)
+            except asyncio.TimeoutError:
+                return await fn()
+            except asyncio.CancelledError:
+                # The leader's client went away; only propagate if we were
+                # cancelled ourselves, otherwise make our own call.
+                task = asyncio.current_task()
+                if not flight.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                return await fn()
+
+        flight = asyncio.get_running_loop().create_future()
+        flight.add_done_callback(_consume_exception)
+        self._flights[key] = flight
+        try:
+            result = await fn()
+        except Exception as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if not flight.done():
+                flight.cancel()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+
+request_coalescer = SingleFlight()
@@ -0,0 +1,202 @@
+"""
+Response compression for everything the gateway sends to clients.
+
+Pure ASGI middleware negotiating brotli or gzip from ``Accept-Encoding``.
+Only content types listed in ``COMPRESSION_CONTENT_TYPES`` are compressed,
+each with its own minimum size. Responses an upstream already encoded
+(streamed through untouched by the proxy) are passed on as-is, so nothing is
+compressed twice. Streamed bodies are compressed chunk by chunk.
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Optional, Tuple
+
+import brotli
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .core.config import settings
+
+# Whole bodies above this size are compressed off the event loop.
+_OFFLOAD_BYTES = 256 * 1024
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header."""
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            weights[coding.strip()] = quality
+    wildcard = weights.get("*", 0.0)
+    for coding in ("br", "gzip"):
+        if weights.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def minimum_size_for(content_type: str) -> Optional[int]:
+    """Longest matching content-type rule; ``None`` means never compress."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    best: Optional[Tuple[int, int]] = None
+    for prefix, minimum in settings.COMPRESSION_CONTENT_TYPES.items():
+        if media_type.startswith(prefix) and (best is None or len(prefix) > best[0]):
+            best = (len(prefix), int(minimum))
+    return best[1] if best else None
+
+
+class _Compressor:
+    def __init__(self, coding: str) -> None:
+        if coding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 16+ selects the gzip container.
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + 15)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress and flush ``data`` so the client can decode it right away."""
+        if not data:
+            return b""
+        # Without a flush the encoder holds small chunks back, which stalls
+        # streamed responses (progress feeds, event streams) until the end.
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def compress_body(coding: str, body: bytes) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    # The encoded bytes differ from the identity ones a strong ETag vouches for.
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = f"W/{etag}"
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, coding, head=scope["method"] == "HEAD")
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, coding: str, *, head: bool) -> None:
+        self._send = send
+        self._coding = coding
+        self._head = head
+        self._start: Optional[Message] = None
+        self._minimum: Optional[int] = None
+        self._compressor: Optional[_Compressor] = None
+        self._passthrough = False
+
+    def _eligible(self, start: Message) -> Optional[int]:
+        """Minimum body size for compression, or ``None`` if not eligible."""
+        headers = Headers(raw=start["headers"])
+        if self._head or start["status"] in (204, 206, 304) or start["status"] < 200:
+            return None
+        if "content-encoding" in headers:
+            return None
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return None
+        return minimum_size_for(headers.get("content-type", ""))
+
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self._start = message
+            self._minimum = self._eligible(message)
+            if self._minimum is None:
+                self._passthrough = True
+                await self._send(message)
+                return
+            _add_vary(MutableHeaders(raw=message["headers"]))
+            declared = Headers(raw=message["headers"]).get("content-length")
+            if declared is not None and int(declared) < self._minimum:
+                self._passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        start = self._start
+        if self._compressor is None and start is not None:
+            headers = MutableHeaders(raw=start["headers"])
+            if not more_body:
+                # The whole body is known: compress it in one go.
+                if len(body) < self._minimum:
+                    self._passthrough = True
+                    await self._send(start)
+                    await self._send(message)
+                    return
+                if len(body) > _OFFLOAD_BYTES:
+                    encoded = await run_in_threadpool(compress_body, self._coding, body)
+                else:
+                    encoded = compress_body(self._coding, body)
+                headers["content-encoding"] = self._coding
+                headers["content-length"] = str(len(encoded))
+                _weaken_etag(headers)
+                self._start = None
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": encoded})
+                return
+
+            headers["content-encoding"] = self._coding
+            if "content-length" in headers:
+                del headers["content-length"]
+            _weaken_etag(headers)
+            self._compressor = _Compressor(self._coding)
+            self._start = None
+            await self._send(start)
+
+        if more_body:
+            chunk = self._compressor.compress(body)
+        else:
+            chunk = self._compressor.finish(body)
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,141 @@
+"""
+Adaptive per-upstream concurrency limits with priority load shedding.
+
+Each upstream service gets an AIMD limit on in-flight requests: the limit
+grows by roughly one per round of fast, successful calls and is cut
+multiplicatively when calls fail or exceed ``CONCURRENCY_SLOW_SECONDS``.
+Requests over the limit wait in a small priority queue (checkout and payment
+ahead of browsing); when the queue is full the lowest-priority waiter is
+shed with a 503 instead of letting every request time out.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core.config import settings
+
+# Lower value is served first.
+PRIORITIES = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+
+
+class Overloaded(Exception):
+    """The request was shed instead of queued."""
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.limit = float(settings.CONCURRENCY_INITIAL_LIMIT)
+        self.in_flight = 0
+        self.shed = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+
+    # ------------------------------------------------------------------ admission
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _live_waiters(self) -> int:
+        return sum(1 for *_, waiter in self._waiters if not waiter.done())
+
+    def _shed_lowest(self, priority: int) -> bool:
+        """Shed the lowest-priority waiter if it ranks below ``priority``."""
+        live = [entry for entry in self._waiters if not entry[2].done()]
+        if not live:
+            return False
+        victim = max(live, key=lambda entry: (entry[0], entry[1]))
+        if victim[0] <= priority:
+            return False
+        victim[2].set_exception(Overloaded(self.name))
+        self.shed += 1
+        return True
+
+    async def acquire(self, priority: str = "normal") -> None:
+        rank = PRIORITIES.get(priority, PRIORITIES["normal"])
+        if self._has_capacity() and not self._live_waiters():
+            self.in_flight += 1
+            return
+
+        if self._live_waiters() >= settings.CONCURRENCY_QUEUE_SIZE and not self._shed_lowest(rank):
+            self.shed += 1
+            raise Overloaded(self.name)
+
+        if len(self._waiters) > 2 * settings.CONCURRENCY_QUEUE_SIZE:
+            # Drop entries left behind by timed-out or shed waiters.
+            self._waiters = [entry for entry in self._waiters if not entry[2].done()]
+            heapq.heapify(self._waiters)
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._sequence), waiter))
+        try:
+            await asyncio.wait_for(waiter, settings.CONCURRENCY_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            raise Overloaded(self.name) from None
+        except asyncio.CancelledError:
+            # Granted just as we were cancelled: hand the slot on.
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release_slot()
+            raise
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_capacity():
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    # ------------------------------------------------------------------ feedback
+    def release(self, ok: bool, latency: Optional[float]) -> None:
+        """Return a slot; ``latency`` is ``None`` for calls that never completed."""
+        if latency is not None:
+            if ok and latency < settings.CONCURRENCY_SLOW_SECONDS:
+                # Additive increase, only while the limit is actually in use.
+                if self.in_flight >= int(self.limit) - 1:
+                    self.limit = min(
+                        settings.CONCURRENCY_MAX_LIMIT, self.limit + 1.0 / self.limit
+                    )
+            else:
+                now = time.monotonic()
+                # One multiplicative decrease per round trip of failures.
+                if now - self._last_decrease >= latency:
+                    self._last_decrease = now
+                    self.limit = max(
+                        settings.CONCURRENCY_MIN_LIMIT,
+                        self.limit * settings.CONCURRENCY_BACKOFF,
+                    )
+        self._release_slot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self._live_waiters(),
+            "shed": self.shed,
+        }
+
+
+class ConcurrencyLimiters:
+    def __init__(self) -> None:
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def get(self, name: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = AdaptiveLimiter(name)
+        return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: limiter.snapshot() for name, limiter in self._limiters.items()}
+
+
+concurrency_limiters = ConcurrencyLimiters()
@@ -0,0 +1 @@
+"""Core utilities (config, logging, etc.)."""
@@ -0,0 +1,275 @@
+"""
+Service-local configuration for the API gateway.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+
+def _parse_float_mapping(raw_value: str | None) -> Dict[str, float]:
+    """Parse ``"/api/v1/catalog=5,/api/v1/payments=15"`` into a dict."""
+    mapping: Dict[str, float] = {}
+    if not raw_value:
+        return mapping
+    for item in raw_value.split(","):
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            continue
+        mapping[key.strip()] = float(value)
+    return mapping
+
+
+def _parse_rate_classes(raw_value: str | None) -> Dict[str, Tuple[int, int]]:
+    """Parse ``"browse=300/100,checkout=20/10"`` into ``{class: (per_minute, burst)}``."""
+    classes: Dict[str, Tuple[int, int]] = {}
+    if not raw_value:
+        return classes
+    for item in raw_value.split(","):
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        per_minute, _, burst = value.partition("/")
+        classes[name.strip()] = (int(per_minute), int(burst or per_minute))
+    return classes
+
+
+def _parse_str_mapping(raw_value: str | None) -> Dict[str, str]:
+    mapping: Dict[str, str] = {}
+    if not raw_value:
+        return mapping
+    for item in raw_value.split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip():
+            mapping[key.strip()] = value.strip().lower()
+    return mapping
+
+
+def _parse_list(raw_value: str | None) -> List[str]:
+    if not raw_value:
+        return []
+    return [item.strip().lower() for item in raw_value.split(",") if item.strip()]
+
+
+def _env_bool(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in {"1", "true", "yes"}
+
+
+@dataclass(slots=True)
+class Settings:
+    """Strongly-typed gateway configuration with sensible defaults."""
+
+    PROJECT_NAME: str = os.getenv("PROJECT_NAME", "Steam Clone API Gateway")
+
+    # ---------- UPSTREAM SERVICES ----------
+    # Each URL setting accepts a comma-separated list of replicas.
+    USER_SERVICE_URL: str = os.getenv("USER_SERVICE_URL", "http://localhost:8001")
+    GAME_CATALOG_SERVICE_URL: str = os.getenv("GAME_CATALOG_SERVICE_URL", "http://localhost:8002")
+    REVIEW_SERVICE_URL: str = os.getenv("REVIEW_SERVICE_URL", "http://localhost:8003")
+    SHOPPING_SERVICE_URL: str = os.getenv("SHOPPING_SERVICE_URL", "http://localhost:8004")
+    PURCHASE_SERVICE_URL: str = os.getenv("PURCHASE_SERVICE_URL", "http://localhost:8005")
+    PAYMENT_SERVICE_URL: str = os.getenv("PAYMENT_SERVICE_URL", "http://localhost:8006")
+    ONLINE_SERVICE_URL: str = os.getenv("ONLINE_SERVICE_URL", "http://localhost:8007")
+    SOCIAL_SERVICE_URL: str = os.getenv("SOCIAL_SERVICE_URL", "http://localhost:8008")
+    NOTIFICATION_SERVICE_URL: str = os.getenv("NOTIFICATION_SERVICE_URL", "http://localhost:8009")
+    RECOMMENDATION_SERVICE_URL: str = os.getenv(
+        "RECOMMENDATION_SERVICE_URL", "http://localhost:8010"
+    )
+    ACHIEVEMENT_SERVICE_URL: str = os.getenv("ACHIEVEMENT_SERVICE_URL", "http://localhost:8011")
+    FRIENDS_CHAT_SERVICE_URL: str = os.getenv("FRIENDS_CHAT_SERVICE_URL", "http://localhost:8013")
+
+    # ---------- AUTH ----------
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me")
+    JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    # Signs the X-Gateway-Identity header; services must share the same value.
+    GATEWAY_IDENTITY_SECRET: str = os.getenv(
+        "GATEWAY_IDENTITY_SECRET", os.getenv("SECRET_KEY", "change-me")
+    )
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "50000"))
+    AUTH_TOKEN_CACHE_MAX_TTL: float = float(os.getenv("AUTH_TOKEN_CACHE_MAX_TTL", "300"))
+
+    # ---------- UPSTREAM CONNECTION POOLS ----------
+    UPSTREAM_MAX_CONNECTIONS: int = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+    UPSTREAM_MAX_KEEPALIVE: int = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+    UPSTREAM_KEEPALIVE_EXPIRY: float = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+    UPSTREAM_CONNECT_TIMEOUT: float = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+    UPSTREAM_POOL_TIMEOUT: float = float(os.getenv("UPSTREAM_POOL_TIMEOUT", "5"))
+    UPSTREAM_TIMEOUT: float = float(os.getenv("UPSTREAM_TIMEOUT", "30"))
+    UPSTREAM_HTTP2: bool = _env_bool("UPSTREAM_HTTP2")
+    ROUTE_TIMEOUTS: Dict[str, float] = field(
+        default_factory=lambda: _parse_float_mapping(os.getenv("ROUTE_TIMEOUTS"))
+    )
+    # Relay bodies chunk by chunk instead of buffering them in the gateway.
+    PROXY_STREAMING: bool = _env_bool("PROXY_STREAMING", "true")
+
+    # ---------- REDIS ----------
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25"))
+
+    # ---------- RATE LIMITING ----------
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "60"))
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = float(
+        os.getenv("RATE_LIMIT_REDIS_RETRY_SECONDS", "5")
+    )
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_LOCAL_MAX_KEYS", "100000"))
+    # Named limits referenced by a route's rate_class: "browse=300/100,checkout=20/10".
+    # Routes without a class use RATE_LIMIT_PER_MINUTE / RATE_LIMIT_BURST.
+    RATE_LIMIT_CLASSES: Dict[str, Tuple[int, int]] = field(
+        default_factory=lambda: _parse_rate_classes(os.getenv("RATE_LIMIT_CLASSES"))
+    )
+
+    # ---------- RESPONSE CACHE ----------
+    # Opt-in per path prefix: "/api/v1/catalog/games=30,/api/v1/catalog/genres=300".
+    # Nothing is cached by default; upstreams do not purge the gateway on writes,
+    # so only list paths whose TTL is an acceptable staleness window.
+    CACHE_TTLS: Dict[str, float] = field(
+        default_factory=lambda: _parse_float_mapping(os.getenv("CACHE_TTLS", ""))
+    )
+    CACHE_VARY_HEADERS: List[str] = field(
+        default_factory=lambda: _parse_list(
+            os.getenv("CACHE_VARY_HEADERS", "accept,accept-language")
+        )
+    )
+    CACHE_LOCAL_MAX_ENTRIES: int = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "5000"))
+    CACHE_REDIS_RETRY_SECONDS: float = float(os.getenv("CACHE_REDIS_RETRY_SECONDS", "5"))
+
+    # ---------- REQUEST COALESCING ----------
+    COALESCE_ENABLED: bool = _env_bool("COALESCE_ENABLED", "true")
+    COALESCE_MAX_WAIT: float = float(os.getenv("COALESCE_MAX_WAIT", "2"))
+    # Prefixes whose GETs stream individually (per-user chat history, presence).
+    COALESCE_EXCLUDE: List[str] = field(
+        default_factory=lambda: _parse_list(
+            os.getenv("COALESCE_EXCLUDE", "/api/v1/friends,/api/v1/online")
+        )
+    )
+
+    # ---------- CIRCUIT BREAKERS ----------
+    CIRCUIT_WINDOW_SECONDS: float = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))
+    CIRCUIT_WINDOW_MAX_SAMPLES: int = int(os.getenv("CIRCUIT_WINDOW_MAX_SAMPLES", "1000"))
+    CIRCUIT_MIN_REQUESTS: int = int(os.getenv("CIRCUIT_MIN_REQUESTS", "20"))
+    CIRCUIT_ERROR_RATE: float = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+    CIRCUIT_SLOW_CALL_SECONDS: float = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+    # 0.05 trips the breaker once p95 latency exceeds CIRCUIT_SLOW_CALL_SECONDS.
+    CIRCUIT_SLOW_CALL_RATE: float = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.05"))
+    CIRCUIT_OPEN_SECONDS: float = float(os.getenv("CIRCUIT_OPEN_SECONDS", "10"))
+    CIRCUIT_MAX_OPEN_SECONDS: float = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "120"))
+    CIRCUIT_HALF_OPEN_PROBES: int = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "3"))
+
+    # ---------- LOAD BALANCING ----------
+    LB_STRATEGY: str = os.getenv("LB_STRATEGY", "p2c")  # p2c | least_outstanding
+    HEALTH_CHECK_PATH: str = os.getenv("HEALTH_CHECK_PATH", "/health")
+    HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", "1"))
+    HEALTH_CHECK_UNHEALTHY_THRESHOLD: int = int(
+        os.getenv("HEALTH_CHECK_UNHEALTHY_THRESHOLD", "2")
+    )
+    HEALTH_CHECK_HEALTHY_THRESHOLD: int = int(os.getenv("HEALTH_CHECK_HEALTHY_THRESHOLD", "1"))
+
+    # ---------- CONCURRENCY LIMITS ----------
+    # AIMD limit on in-flight requests per upstream service.
+    CONCURRENCY_INITIAL_LIMIT: int = int(os.getenv("CONCURRENCY_INITIAL_LIMIT", "20"))
+    CONCURRENCY_MIN_LIMIT: int = int(os.getenv("CONCURRENCY_MIN_LIMIT", "2"))
+    CONCURRENCY_MAX_LIMIT: int = int(os.getenv("CONCURRENCY_MAX_LIMIT", "200"))
+    CONCURRENCY_BACKOFF: float = float(os.getenv("CONCURRENCY_BACKOFF", "0.9"))
+    CONCURRENCY_SLOW_SECONDS: float = float(os.getenv("CONCURRENCY_SLOW_SECONDS", "1"))
+    CONCURRENCY_QUEUE_SIZE: int = int(os.getenv("CONCURRENCY_QUEUE_SIZE", "50"))
+    CONCURRENCY_QUEUE_TIMEOUT: float = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT", "1"))
+    # Queue priority per path prefix: critical | high | normal | low.
+    ROUTE_PRIORITIES: Dict[str, str] = field(
+        default_factory=lambda: _parse_str_mapping(
+            os.getenv(
+                "ROUTE_PRIORITIES",
+                "/api/v1/payments=critical,/api/v1/purchases=critical,"
+                "/api/v1/shopping/cart=high,/api/v1/recommendations=low",
+            )
+        )
+    )
+
+    # ---------- HEDGING AND RETRIES ----------
+    # Opt-in per path prefix (off by default), e.g. HEDGE_ROUTES=/api/v1/catalog
+    # and ROUTE_RETRIES=/api/v1/catalog=1; only GET/HEAD requests are repeated.
+    HEDGE_ROUTES: List[str] = field(
+        default_factory=lambda: _parse_list(os.getenv("HEDGE_ROUTES", ""))
+    )
+    ROUTE_RETRIES: Dict[str, float] = field(
+        default_factory=lambda: _parse_float_mapping(os.getenv("ROUTE_RETRIES", ""))
+    )
+    HEDGE_WINDOW: int = int(os.getenv("HEDGE_WINDOW", "500"))
+    HEDGE_REFRESH_EVERY: int = int(os.getenv("HEDGE_REFRESH_EVERY", "50"))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "50"))
+    HEDGE_MIN_DELAY: float = float(os.getenv("HEDGE_MIN_DELAY", "0.01"))
+    # Extra attempts allowed per regular request, plus a floor rate so
+    # low-traffic services can still retry.
+    RETRY_BUDGET_RATIO: float = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+    RETRY_BUDGET_MIN_PER_SECOND: float = float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1"))
+    RETRY_BUDGET_CAP: float = float(os.getenv("RETRY_BUDGET_CAP", "20"))
+
+    # ---------- COMPRESSION ----------
+    COMPRESSION_ENABLED: bool = _env_bool("COMPRESSION_ENABLED", "true")
+    # Content-type prefix -> minimum body size in bytes; unlisted types are
+    # never compressed (images, archives and other already-dense payloads).
+    COMPRESSION_CONTENT_TYPES: Dict[str, float] = field(
+        default_factory=lambda: _parse_float_mapping(
+            os.getenv(
+                "COMPRESSION_CONTENT_TYPES",
+                "application/json=1024,text/=1024,application/javascript=1024,"
+                "application/xml=1024,image/svg+xml=1024",
+            )
+        )
+    )
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # ---------- WEBSOCKET PROXY ----------
+    WS_OPEN_TIMEOUT: float = float(os.getenv("WS_OPEN_TIMEOUT", "5"))
+    WS_PING_INTERVAL: float = float(os.getenv("WS_PING_INTERVAL", "20"))
+    WS_MAX_MESSAGE_BYTES: int = int(os.getenv("WS_MAX_MESSAGE_BYTES", str(1024 * 1024)))
+    # Frames buffered from the upstream before the gateway stops reading it.
+    WS_MAX_QUEUE: int = int(os.getenv("WS_MAX_QUEUE", "16"))
+    WS_WRITE_LIMIT: int = int(os.getenv("WS_WRITE_LIMIT", "65536"))
+
+    # ---------- STORE PAGE AGGREGATION ----------
+    # Per-section deadlines in seconds; sections that miss theirs are dropped.
+    AGGREGATE_DEADLINES: Dict[str, float] = field(
+        default_factory=lambda: _parse_float_mapping(
+            os.getenv(
+                "AGGREGATE_DEADLINES",
+                "game=1.5,reviews=0.8,cart=0.5,wishlist=0.5,purchases=0.5,recommendations=0.8",
+            )
+        )
+    )
+    AGGREGATE_DEFAULT_DEADLINE: float = float(os.getenv("AGGREGATE_DEFAULT_DEADLINE", "1"))
+    AGGREGATE_REVIEW_LIMIT: int = int(os.getenv("AGGREGATE_REVIEW_LIMIT", "10"))
+    AGGREGATE_RECOMMENDATION_LIMIT: int = int(os.getenv("AGGREGATE_RECOMMENDATION_LIMIT", "10"))
+
+    # ---------- BATCH ----------
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "50"))
+    # Sub-requests of one batch in flight at a time.
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+    # ---------- ROUTING ----------
+    # Optional JSON route table (services, per-route policies) layered over
+    # the settings above; polled for changes every RELOAD_INTERVAL seconds.
+    GATEWAY_ROUTES_FILE: str = os.getenv("GATEWAY_ROUTES_FILE", "")
+    GATEWAY_ROUTES_RELOAD_INTERVAL: float = float(
+        os.getenv("GATEWAY_ROUTES_RELOAD_INTERVAL", "10")
+    )
+
+    # ---------- METRICS ----------
+    # Histogram range and precision: each power of two is split into
+    # SUB_BUCKETS buckets.
+    METRICS_MIN_SECONDS: float = float(os.getenv("METRICS_MIN_SECONDS", "0.0005"))
+    METRICS_MAX_SECONDS: float = float(os.getenv("METRICS_MAX_SECONDS", "30"))
+    METRICS_SUB_BUCKETS: int = int(os.getenv("METRICS_SUB_BUCKETS", "4"))
+    # Distinct route labels tracked before new ones are folded into "other".
+    METRICS_MAX_ROUTES: int = int(os.getenv("METRICS_MAX_ROUTES", "100"))
+
+    # ---------- ADMIN ----------
+    # Required in the X-Admin-Token header of /gateway/* endpoints; unset
+    # disables them (404).
+    GATEWAY_ADMIN_TOKEN: str = os.getenv("GATEWAY_ADMIN_TOKEN", "")
+
+
+settings = Settings()
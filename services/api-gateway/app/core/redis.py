@@ -0,0 +1,14 @@
+"""
+Shared asyncio Redis client for gateway features (rate limiting, caching).
+"""
+from __future__ import annotations
+
+import redis.asyncio as aioredis
+
+from .config import settings
+
+redis_client = aioredis.from_url(
+    settings.REDIS_URL,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
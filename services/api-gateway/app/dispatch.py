@@ -0,0 +1,108 @@
+"""
+Replica selection and circuit-breaker accounting around one upstream call.
+
+Both the catch-all proxy and gateway-composed endpoints (store page
+aggregation) send requests through :func:`dispatch`, so every upstream call
+is load balanced and counted by the same breakers.
+"""
+from __future__ import annotations
+
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+import httpx
+from fastapi import HTTPException
+
+from .balancer import Replica, ReplicaSet
+from .circuit_breaker import circuit_breakers
+from .concurrency import Overloaded, concurrency_limiters
+from .metrics import ConnectTimer, gateway_metrics
+from .upstream import upstreams
+
+RequestBuilder = Callable[[httpx.AsyncClient], Awaitable[httpx.Request]]
+
+
+class LoadShed(HTTPException):
+    """503 from this gateway's own concurrency limiter; never worth a retry."""
+
+
+def unavailable(retry_after: int, *, shed: bool = False) -> HTTPException:
+    return (LoadShed if shed else HTTPException)(
+        status_code=503,
+        detail="Service temporarily unavailable",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+async def dispatch(
+    replica_set: ReplicaSet,
+    build: RequestBuilder,
+    *,
+    priority: str = "normal",
+    tried: Optional[Set[Replica]] = None,
+) -> httpx.Response:
+    """Send the request produced by ``build`` to one replica, streamed.
+
+    A slot of the service's adaptive concurrency limit is held until the
+    upstream's response headers arrive. Replicas in ``tried`` are skipped and
+    the chosen one is added to it.
+    """
+    limiter = concurrency_limiters.get(replica_set.name)
+    try:
+        await limiter.acquire(priority)
+    except Overloaded:
+        raise unavailable(1, shed=True)
+
+    ok, latency = False, None
+    try:
+        replica = replica_set.pick(exclude=tried or ())
+        if replica is None:
+            # Every replica's circuit is open: fail fast
+            raise unavailable(replica_set.retry_after())
+        if tried is not None:
+            tried.add(replica)
+
+        client = upstreams.client_for(replica.url)
+        upstream_request = await build(client)
+        connect_timer = ConnectTimer()
+        upstream_request.extensions["trace"] = connect_timer
+        breaker = circuit_breakers.get(replica.url)
+        if not breaker.allow():
+            raise unavailable(breaker.retry_after())
+
+        started = time.perf_counter()
+        replica.outstanding += 1
+        try:
+            upstream = await client.send(upstream_request, stream=True)
+        except httpx.RequestError as e:
+            latency = time.perf_counter() - started
+            breaker.record(False, latency)
+            raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
+        except BaseException:
+            breaker.release()
+            raise
+        finally:
+            replica.outstanding -= 1
+        latency = time.perf_counter() - started
+        ok = upstream.status_code < 500
+        breaker.record(ok, latency)
+        connect = connect_timer.seconds
+        if connect is not None:
+            gateway_metrics.observe("connect", connect)
+        gateway_metrics.observe("ttfb", latency - (connect or 0.0))
+        return upstream
+    finally:
+        limiter.release(ok, latency)
+
+
+async def read_body(upstream: httpx.Response) -> httpx.Response:
+    """Read a streamed upstream response fully and release its connection."""
+    started = time.perf_counter()
+    try:
+        await upstream.aread()
+        gateway_metrics.observe("body", time.perf_counter() - started)
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
+    finally:
+        await upstream.aclose()
+    return upstream
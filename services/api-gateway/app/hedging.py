@@ -0,0 +1,184 @@
+"""
+Hedged requests and budgeted retries for idempotent upstream calls.
+
+For routes that opt in, a GET that has not answered by the route's recent p95
+latency gets a duplicate sent to another replica and the first answer wins.
+Failed attempts (connection errors, 5xx) may be retried on another replica,
+except when this gateway's concurrency limiter shed the request.
+Both extra attempts draw from a per-service retry budget that only refills
+with a fraction of regular traffic (plus a small floor rate), so hedges and
+retries can never multiply load during an outage.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set
+
+import httpx
+from fastapi import HTTPException
+
+from .balancer import Replica, ReplicaSet
+from .core.config import settings
+from .dispatch import LoadShed
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+Attempt = Callable[[Set[Replica]], Awaitable[httpx.Response]]
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies with a periodically refreshed p95."""
+
+    def __init__(self) -> None:
+        self._samples: Deque[float] = deque(maxlen=settings.HEDGE_WINDOW)
+        self._since_refresh = 0
+        self._p95: Optional[float] = None
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._since_refresh += 1
+        if self._since_refresh >= settings.HEDGE_REFRESH_EVERY:
+            self._since_refresh = 0
+            ordered = sorted(self._samples)
+            self._p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def hedge_delay(self) -> Optional[float]:
+        if self._p95 is None or len(self._samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        return max(self._p95, settings.HEDGE_MIN_DELAY)
+
+
+class RetryBudget:
+    """Token budget: each request deposits ``RETRY_BUDGET_RATIO`` tokens."""
+
+    def __init__(self) -> None:
+        self._tokens = float(settings.RETRY_BUDGET_CAP)
+        self._updated = time.monotonic()
+
+    def deposit(self) -> None:
+        self._tokens = min(settings.RETRY_BUDGET_CAP, self._tokens + settings.RETRY_BUDGET_RATIO)
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(
+            settings.RETRY_BUDGET_CAP,
+            self._tokens + (now - self._updated) * settings.RETRY_BUDGET_MIN_PER_SECOND,
+        )
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+# Losing attempts are cleaned up in the background; keep them referenced.
+_cleanup: Set[asyncio.Task] = set()
+
+
+def tracker_for(route_prefix: str) -> LatencyTracker:
+    tracker = _trackers.get(route_prefix)
+    if tracker is None:
+        tracker = _trackers[route_prefix] = LatencyTracker()
+    return tracker
+
+
+def budget_for(service: str) -> RetryBudget:
+    budget = _budgets.get(service)
+    if budget is None:
+        budget = _budgets[service] = RetryBudget()
+    return budget
+
+
+async def _discard(tasks: Set[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, httpx.Response):
+            await result.aclose()
+
+
+async def send_hedged(
+    attempt: Attempt,
+    replica_set: ReplicaSet,
+    route_prefix: str,
+    *,
+    hedge: bool,
+    retries: int,
+) -> httpx.Response:
+    """Run ``attempt`` with hedging and/or retries; first good answer wins."""
+    tracker = tracker_for(route_prefix)
+    budget = budget_for(replica_set.name)
+    budget.deposit()
+
+    tried: Set[Replica] = set()
+    started: Dict[asyncio.Task, float] = {}
+
+    def spawn() -> None:
+        # Prefer a replica this request has not used yet; ``dispatch`` adds
+        # its pick to ``tried``.
+        exclude = tried if replica_set.can_pick(exclude=tried) else set()
+        task = asyncio.create_task(attempt(exclude))
+        started[task] = time.perf_counter()
+
+    spawn()
+    pending: Set[asyncio.Task] = set(started)
+    hedge_delay = tracker.hedge_delay() if hedge else None
+    failed_response: Optional[httpx.Response] = None
+    failure: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                # Past the route's p95 with no answer: hedge once.
+                hedge_delay = None
+                if replica_set.can_pick(exclude=tried) and budget.try_spend():
+                    spawn()
+                    pending = {task for task in started if not task.done()}
+                continue
+
+            for task in done:
+                try:
+                    upstream = task.result()
+                except LoadShed as e:
+                    # Shed by our own limiter: more attempts would only add load.
+                    failure = e
+                    retries = 0
+                    continue
+                except HTTPException as e:
+                    failure = e
+                    continue
+                # Only attempts that answered are sampled: a cancelled loser's
+                # elapsed time is cut short by the winner and would drag p95 down.
+                tracker.record(time.perf_counter() - started[task])
+                if upstream.status_code < 500:
+                    if failed_response is not None:
+                        await failed_response.aclose()
+                    others = (done | pending) - {task}
+                    pending = set()
+                    if others:
+                        cleanup = asyncio.create_task(_discard(others))
+                        _cleanup.add(cleanup)
+                        cleanup.add_done_callback(_cleanup.discard)
+                    return upstream
+                if failed_response is not None:
+                    await failed_response.aclose()
+                failed_response = upstream
+
+            if not pending and retries > 0 and budget.try_spend():
+                retries -= 1
+                spawn()
+                pending = {task for task in started if not task.done()}
+    finally:
+        if pending:
+            await _discard(pending)
+
+    if failed_response is not None:
+        return failed_response
+    raise failure
@@ -1,30 +1,35 @@
 """
 API Gateway Service
 """
-from fastapi import FastAPI, Request, HTTPException
+import hmac
+import time
+from typing import Awaitable, List, Optional
+
+from fastapi import Depends, FastAPI, Header, Request, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse, Response
 import httpx
-import redis
-import os
-
-# Service URLs
-USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://localhost:8001")
-GAME_CATALOG_SERVICE_URL = os.getenv("GAME_CATALOG_SERVICE_URL", "http://localhost:8002")
-REVIEW_SERVICE_URL = os.getenv("REVIEW_SERVICE_URL", "http://localhost:8003")
-SHOPPING_SERVICE_URL = os.getenv("SHOPPING_SERVICE_URL", "http://localhost:8004")
-PURCHASE_SERVICE_URL = os.getenv("PURCHASE_SERVICE_URL", "http://localhost:8005")
-PAYMENT_SERVICE_URL = os.getenv("PAYMENT_SERVICE_URL", "http://localhost:8006")
-ONLINE_SERVICE_URL = os.getenv("ONLINE_SERVICE_URL", "http://localhost:8007")
-SOCIAL_SERVICE_URL = os.getenv("SOCIAL_SERVICE_URL", "http://localhost:8008")
-NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://localhost:8009")
-RECOMMENDATION_SERVICE_URL = os.getenv("RECOMMENDATION_SERVICE_URL", "http://localhost:8010")
-ACHIEVEMENT_SERVICE_URL = os.getenv("ACHIEVEMENT_SERVICE_URL", "http://localhost:8011")
-FRIENDS_CHAT_SERVICE_URL = os.getenv("FRIENDS_CHAT_SERVICE_URL", "http://localhost:8013")
-
-# Redis connection
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+
+from .aggregation import build_store_page
+from .auth import authenticate, identity_headers, user_id_of
+from .balancer import health_checker
+from .batch import run_batch
+from .cache import response_cache
+from .circuit_breaker import circuit_breakers
+from .compression import CompressionMiddleware
+from .concurrency import concurrency_limiters
+from .coalesce import coalesce_key, is_coalescable, request_coalescer
+from .core.config import settings
+from .core.redis import redis_client
+from .dispatch import dispatch, read_body
+from .hedging import IDEMPOTENT_METHODS, send_hedged
+from .metrics import gateway_metrics, set_labels
+from .proxy import build_upstream_request, buffered_response, streaming_response
+from .rate_limit import rate_limiter
+from .routing import Route, RouteConfigError, routes
+from .schemas import BatchItem, BatchResult, CachePurgeRequest
+from .upstream import upstreams
+from .websocket_proxy import proxy_websocket
 
 # Create FastAPI app
 app = FastAPI(
@@ -44,92 +49,156 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Service routing configuration
-SERVICE_ROUTES = {
-    "/api/v1/users": USER_SERVICE_URL,
-    "/api/v1/catalog": GAME_CATALOG_SERVICE_URL,
-    "/api/v1/reviews": REVIEW_SERVICE_URL,
-    "/api/v1/shopping": SHOPPING_SERVICE_URL,
-    "/api/v1/purchases": PURCHASE_SERVICE_URL,
-    "/api/v1/payments": PAYMENT_SERVICE_URL,
-    "/api/v1/online": ONLINE_SERVICE_URL,
-    "/api/v1/social": SOCIAL_SERVICE_URL,
-    "/api/v1/notifications": NOTIFICATION_SERVICE_URL,
-    "/api/v1/recommendations": RECOMMENDATION_SERVICE_URL,
-    "/api/v1/achievements": ACHIEVEMENT_SERVICE_URL,
-    "/api/v1/friends": FRIENDS_CHAT_SERVICE_URL,
-}
-
-# Rate limiting configuration
-RATE_LIMIT_PER_MINUTE = 60
-
-def get_rate_limit_key(request: Request) -> str:
-    """Get rate limiting key based on client IP"""
-    client_ip = request.client.host if request.client else "unknown"
-    return f"rate_limit:{client_ip}"
-
-def check_rate_limit(request: Request) -> bool:
-    """Check if request is within rate limit"""
-    key = get_rate_limit_key(request)
-    current_count = redis_client.get(key)
-    
-    if current_count is None:
-        redis_client.setex(key, 60, 1)
-        return True
-    
-    if int(current_count) >= RATE_LIMIT_PER_MINUTE:
-        return False
-    
-    redis_client.incr(key)
-    return True
-
-async def proxy_request(request: Request, service_url: str) -> JSONResponse:
+# Compress client-bound responses (upstream-encoded bodies pass through)
+app.add_middleware(CompressionMiddleware)
+
+@app.on_event("startup")
+async def _startup() -> None:
+    services = routes.table.services.values()
+    await upstreams.start(url for replica_set in services for url in replica_set.urls)
+    health_checker.start(services)
+    response_cache.start()
+    routes.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    await routes.close()
+    await response_cache.close()
+    await health_checker.close()
+    await upstreams.close()
+    await redis_client.close()
+
+
+async def send_upstream(request: Request, route: Route, *, stream_body: bool) -> httpx.Response:
+    """Open a streamed upstream response over the pooled keep-alive client"""
+    policy = route.policy
+    repeatable = request.method in IDEMPOTENT_METHODS and (policy.hedge or policy.retries)
+    if repeatable:
+        # A request stream can be read only once; buffer it for every attempt.
+        stream_body = False
+
+    def attempt(tried=None) -> Awaitable[httpx.Response]:
+        return dispatch(
+            route.service,
+            lambda client: build_upstream_request(
+                client,
+                request,
+                upstreams.timeout_for(policy.timeout),
+                stream_body=stream_body,
+                extra_headers=identity_headers(request),
+            ),
+            priority=policy.priority,
+            tried=tried,
+        )
+
+    if repeatable:
+        return await send_hedged(
+            attempt, route.service, route.prefix, hedge=policy.hedge, retries=policy.retries
+        )
+    return await attempt()
+
+
+async def fetch_upstream(request: Request, route: Route) -> httpx.Response:
+    """Send request upstream and read the whole body"""
+    return await read_body(await send_upstream(request, route, stream_body=False))
+
+
+async def cached_proxy(request: Request, route: Route, ttl: float) -> Response:
+    """Serve a GET from the response cache, filling it on a miss"""
+    key = response_cache.key_for(request)
+    entry = await response_cache.get(key)
+    gateway_metrics.count_cache(route.prefix, hit=entry is not None)
+    if entry is not None:
+        return response_cache.respond(entry, request, hit=True)
+
+    async def fill():
+        upstream = await fetch_upstream(request, route)
+        return upstream, await response_cache.store(key, upstream, ttl)
+
+    if route.policy.coalesce and is_coalescable(request):
+        upstream, entry = await request_coalescer.do(
+            coalesce_key(request), fill, settings.COALESCE_MAX_WAIT
+        )
+    else:
+        upstream, entry = await fill()
+    if entry is None:
+        return buffered_response(upstream)
+    return response_cache.respond(entry, request, hit=False)
+
+
+async def enforce_rate_limit(request: Request, bucket: str, rate_class: str = "default") -> None:
+    """Reject the request with 429 once the caller's bucket is empty"""
+    decision = await rate_limiter.check(request, bucket, rate_class)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(decision.retry_after)},
+        )
+
+
+async def proxy_request(request: Request, route: Route) -> Response:
     """Proxy request to appropriate service"""
-    # Check rate limit
-    if not check_rate_limit(request):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
-    
-    # Prepare request
-    url = f"{service_url}{request.url.path}"
-    params = dict(request.query_params)
-    headers = dict(request.headers)
-    
-    # Remove host header to avoid conflicts
-    headers.pop("host", None)
-    
-    # Make request
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.request(
-                method=request.method,
-                url=url,
-                params=params,
-                headers=headers,
-                content=await request.body(),
-                timeout=30.0
-            )
-            
-            # Determine content type
-            content_type = response.headers.get("content-type", "")
-            is_json = content_type.startswith("application/json")
-            
-            # Parse response content
-            if is_json:
-                try:
-                    content = response.json()
-                except Exception:
-                    # Fallback to text if JSON parsing fails
-                    content = response.text
-            else:
-                content = response.text
-            
-            return JSONResponse(
-                content=content,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
+    service = route.service.name
+    set_labels(route.prefix, service)
+    gateway_metrics.track_in_flight(route.prefix, 1)
+    try:
+        response = await forward_request(request, route)
+    except HTTPException as e:
+        gateway_metrics.count_response(route.prefix, service, e.status_code, gateway_error=True)
+        raise
+    finally:
+        gateway_metrics.track_in_flight(route.prefix, -1)
+    gateway_metrics.count_response(route.prefix, service, response.status_code, gateway_error=False)
+    return response
+
+
+async def forward_request(request: Request, route: Route) -> Response:
+    """Apply the route's policy and forward the request upstream"""
+    policy = route.policy
+    if policy.auth == "required" and authenticate(request) is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Authentication required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Check rate limit; named classes share one bucket across their routes
+    bucket = route.service.name if policy.rate_class == "default" else policy.rate_class
+    started = time.perf_counter()
+    try:
+        await enforce_rate_limit(request, bucket, policy.rate_class)
+    finally:
+        gateway_metrics.observe("rate_limit", time.perf_counter() - started)
+
+    if policy.cache_ttl and response_cache.is_cacheable_request(request):
+        return await cached_proxy(request, route, policy.cache_ttl)
+
+    # Identical concurrent GETs share one upstream call
+    if policy.coalesce and is_coalescable(request):
+        upstream = await request_coalescer.do(
+            coalesce_key(request),
+            lambda: fetch_upstream(request, route),
+            settings.COALESCE_MAX_WAIT,
+        )
+        return buffered_response(upstream)
+
+    # Forward without decoding the payload
+    if policy.stream:
+        upstream = await send_upstream(request, route, stream_body=True)
+        return streaming_response(upstream)
+    return buffered_response(await fetch_upstream(request, route))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Guard gateway admin endpoints; they do not exist until a token is configured"""
+    expected = settings.GATEWAY_ADMIN_TOKEN
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 
 @app.get("/health")
 def health_check():
@@ -142,32 +211,96 @@ def root():
     return {
         "message": "Steam Clone API Gateway",
         "version": "1.0.0",
-        "services": list(SERVICE_ROUTES.keys())
+        "services": routes.table.service_prefixes
     }
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint: phase latency histograms and request counters"""
+    return PlainTextResponse(
+        gateway_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/gateway/admin/upstreams", dependencies=[Depends(require_admin)])
+def upstream_states():
+    """Replica health, load and circuit state per routed service"""
+    return {name: replica_set.snapshot() for name, replica_set in routes.table.services.items()}
+
+
+@app.post("/gateway/admin/routes/reload", dependencies=[Depends(require_admin)])
+def reload_routes():
+    """Recompile the route table from settings and GATEWAY_ROUTES_FILE"""
+    try:
+        table = routes.reload()
+    except RouteConfigError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"services": table.service_prefixes}
+
+
+@app.get("/gateway/admin/circuits", dependencies=[Depends(require_admin)])
+def circuit_states():
+    """Current circuit breaker state and rolling stats per upstream"""
+    return circuit_breakers.snapshot()
+
+
+@app.get("/gateway/admin/concurrency", dependencies=[Depends(require_admin)])
+def concurrency_states():
+    """Adaptive concurrency limit, in-flight, queued and shed counts per upstream"""
+    return concurrency_limiters.snapshot()
+
+
+@app.post("/gateway/cache/purge", dependencies=[Depends(require_admin)])
+async def purge_cache(payload: CachePurgeRequest):
+    """Invalidate cached responses under the given path prefixes on every gateway"""
+    await response_cache.purge(payload.prefixes)
+    return {"purged": payload.prefixes}
+
+
+@app.get("/api/v1/store/games/{game_id}")
+async def store_page(request: Request, game_id: str):
+    """Game page document composed from catalog, reviews, shopping, purchases and recommendations"""
+    await enforce_rate_limit(request, "store-page")
+    claims = authenticate(request)
+    return await build_store_page(request, game_id, user_id_of(claims) if claims else None)
+
+
+@app.post("/api/v1/batch", response_model=List[BatchResult])
+async def batch(request: Request, items: List[BatchItem]):
+    """Run several API calls concurrently and return their results in order"""
+    return await run_batch(request, items, proxy_request)
+
+
+@app.websocket("/ws/lobbies/{lobby_id}")
+async def lobby_socket(websocket: WebSocket, lobby_id: str):
+    """Relay a lobby channel to the online-service replica that owns the lobby"""
+    decision = await rate_limiter.check(websocket, "online-service")
+    if not decision.allowed:
+        await websocket.close(code=1008)
+        return
+    await proxy_websocket(
+        websocket,
+        routes.table.services["online-service"],
+        f"/ws/lobbies/{lobby_id}",
+        sticky_key=lobby_id,
+    )
+
+
 # Dynamic route handling for all service endpoints
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def proxy_all_requests(request: Request, path: str):
     """Proxy all requests to appropriate services"""
-    # Normalize path to include leading slash for comparison
-    normalized_path = f"/{path}" if not path.startswith("/") else path
-    
-    # Find matching service
-    service_url = None
-    for route_prefix, url in SERVICE_ROUTES.items():
-        if normalized_path.startswith(route_prefix):
-            service_url = url
-            break
-    
-    if not service_url:
+    route = routes.table.match(request.url.path)
+    if route is None:
         raise HTTPException(status_code=404, detail="Service not found")
-    
-    return await proxy_request(request, service_url)
+
+    return await proxy_request(request, route)
 
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=True
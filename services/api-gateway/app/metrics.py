@@ -0,0 +1,193 @@
+"""
+Gateway latency histograms and request counters, exported for Prometheus.
+
+Every proxied call is split into phases: the rate-limit check, opening a new
+upstream connection (only when the pool had none to reuse), time to first
+byte (request sent to response headers, excluding connect) and body
+transfer. Each phase is recorded per route and upstream service in an
+HDR-style log-linear histogram: every power of two between
+``METRICS_MIN_SECONDS`` and ``METRICS_MAX_SECONDS`` is split into
+``METRICS_SUB_BUCKETS`` equal buckets, so the relative error is the same at
+1 ms and at 10 s.
+
+Labels only ever hold configured route prefixes, service names, phase names
+and status classes, and at most ``METRICS_MAX_ROUTES`` distinct routes are
+tracked (later ones are folded into ``other``), so series counts stay
+bounded whatever paths clients send.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .core.config import settings
+
+# (route prefix, service) of the call being proxied in this task. Set once by
+# the handler and inherited by hedge/stream tasks it spawns.
+_labels: ContextVar[Tuple[str, str]] = ContextVar("gateway_metric_labels", default=("other", "other"))
+
+
+def _bucket_bounds() -> List[float]:
+    bounds: List[float] = []
+    low = settings.METRICS_MIN_SECONDS
+    while low < settings.METRICS_MAX_SECONDS:
+        step = low / settings.METRICS_SUB_BUCKETS
+        bounds += [low + step * i for i in range(1, settings.METRICS_SUB_BUCKETS + 1)]
+        low *= 2
+    return [settings.METRICS_MIN_SECONDS] + bounds
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "total", "count")
+
+    bounds: List[float] = []
+
+    def __init__(self) -> None:
+        # One slot per upper bound plus the +Inf overflow bucket.
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+LatencyHistogram.bounds = _bucket_bounds()
+
+
+def set_labels(route: str, service: str) -> None:
+    _labels.set((route, service))
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+class GatewayMetrics:
+    def __init__(self) -> None:
+        self._routes: set[str] = set()
+        self.phases: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.in_flight: Dict[Tuple[str], int] = {}
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+
+    def _route(self, route: str) -> str:
+        if route in self._routes:
+            return route
+        if len(self._routes) >= settings.METRICS_MAX_ROUTES:
+            return "other"
+        self._routes.add(route)
+        return route
+
+    # ------------------------------------------------------------------ recording
+    def observe(self, phase: str, seconds: float) -> None:
+        route, service = _labels.get()
+        key = (self._route(route), service, phase)
+        histogram = self.phases.get(key)
+        if histogram is None:
+            histogram = self.phases[key] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def track_in_flight(self, route: str, delta: int) -> None:
+        key = (self._route(route),)
+        self.in_flight[key] = self.in_flight.get(key, 0) + delta
+
+    def count_response(self, route: str, service: str, status_code: int, *, gateway_error: bool) -> None:
+        """Count a response; 5xx and gateway-raised errors also count as errors."""
+        key = (self._route(route), service, status_class(status_code))
+        self.responses[key] = self.responses.get(key, 0) + 1
+        if gateway_error or status_code >= 500:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def count_cache(self, route: str, hit: bool) -> None:
+        key = (self._route(route), "hit" if hit else "miss")
+        self.cache[key] = self.cache.get(key, 0) + 1
+
+    # ------------------------------------------------------------------ export
+    def _histograms(self) -> Iterator[str]:
+        name = "gateway_phase_duration_seconds"
+        yield f"# HELP {name} Time spent per request phase, by route and upstream service."
+        yield f"# TYPE {name} histogram"
+        names = ("route", "service", "phase")
+        edges = [f"{bound:.6g}" for bound in LatencyHistogram.bounds] + ["+Inf"]
+        for key, histogram in sorted(self.phases.items()):
+            cumulative = 0
+            for edge, count in zip(edges, histogram.counts):
+                cumulative += count
+                le = f'le="{edge}"'
+                yield f"{name}_bucket{_format_labels(names, key, le)} {cumulative}"
+            yield f"{name}_sum{_format_labels(names, key)} {histogram.total:.6f}"
+            yield f"{name}_count{_format_labels(names, key)} {histogram.count}"
+
+    @staticmethod
+    def _family(
+        name: str, kind: str, help_text: str, names: Tuple[str, ...], values: Dict[tuple, int]
+    ) -> Iterator[str]:
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} {kind}"
+        for key, value in sorted(values.items()):
+            yield f"{name}{_format_labels(names, key)} {value}"
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = list(self._histograms())
+        lines += self._family(
+            "gateway_requests_in_flight", "gauge",
+            "Proxied requests currently being handled.", ("route",), self.in_flight,
+        )
+        lines += self._family(
+            "gateway_responses_total", "counter",
+            "Proxied responses by status class.", ("route", "service", "code"), self.responses,
+        )
+        lines += self._family(
+            "gateway_errors_total", "counter",
+            "Upstream 5xx and gateway-generated error responses.",
+            ("route", "service", "code"), self.errors,
+        )
+        lines += self._family(
+            "gateway_cache_requests_total", "counter",
+            "Response cache lookups by result.", ("route", "result"), self.cache,
+        )
+        return "\n".join(lines) + "\n"
+
+
+class ConnectTimer:
+    """httpx ``trace`` hook measuring a new connection's TCP and TLS setup."""
+
+    __slots__ = ("_started", "_connected")
+
+    def __init__(self) -> None:
+        self._started: Optional[float] = None
+        self._connected: Optional[float] = None
+
+    async def __call__(self, event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.started":
+            self._started = time.perf_counter()
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self._connected = time.perf_counter()
+
+    @property
+    def seconds(self) -> Optional[float]:
+        """``None`` when the request went out on a pooled connection."""
+        if self._started is None or self._connected is None:
+            return None
+        return self._connected - self._started
+
+
+gateway_metrics = GatewayMetrics()
@@ -0,0 +1,127 @@
+"""
+Request/response forwarding helpers for the gateway proxy.
+
+Bodies are forwarded as opaque bytes: the gateway never decodes or re-encodes
+upstream payloads, and hop-by-hop headers (RFC 7230 section 6.1) are stripped
+in both directions.
+"""
+from __future__ import annotations
+
+import time
+from typing import AsyncIterator, Iterable, List, Sequence, Tuple
+
+import httpx
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from .auth import IDENTITY_HEADER
+from .metrics import gateway_metrics
+
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "proxy-connection",
+        "te",
+        "trailer",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+
+
+def _excluded(headers: Iterable[Tuple[str, str]], extra: Iterable[str]) -> frozenset[str]:
+    """Hop-by-hop names plus any header nominated by ``Connection``."""
+    nominated = {
+        token.strip().lower()
+        for name, value in headers
+        if name.lower() == "connection"
+        for token in value.split(",")
+        if token.strip()
+    }
+    return HOP_BY_HOP_HEADERS | nominated | {name.lower() for name in extra}
+
+
+def filter_request_headers(request: Request) -> List[Tuple[str, str]]:
+    items = request.headers.items()
+    # Identity headers are only ever set by the gateway itself.
+    excluded = _excluded(items, ("host", IDENTITY_HEADER))
+    return [(name, value) for name, value in items if name.lower() not in excluded]
+
+
+def filter_response_headers(
+    upstream: httpx.Response, drop: Iterable[str] = ()
+) -> List[Tuple[bytes, bytes]]:
+    items = upstream.headers.multi_items()
+    excluded = _excluded(items, drop)
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in items
+        if name.lower() not in excluded
+    ]
+
+
+def _has_body(request: Request) -> bool:
+    return "content-length" in request.headers or "transfer-encoding" in request.headers
+
+
+def upstream_url(request: Request) -> str:
+    """Path plus the raw query string, so repeated params survive intact."""
+    query = request.url.query
+    return f"{request.url.path}?{query}" if query else request.url.path
+
+
+async def build_upstream_request(
+    client: httpx.AsyncClient,
+    request: Request,
+    timeout: httpx.Timeout,
+    *,
+    stream_body: bool,
+    extra_headers: Sequence[Tuple[str, str]] = (),
+) -> httpx.Request:
+    if not _has_body(request):
+        content = None
+    elif stream_body:
+        content = request.stream()
+    else:
+        content = await request.body()
+    return client.build_request(
+        request.method,
+        upstream_url(request),
+        headers=filter_request_headers(request) + list(extra_headers),
+        content=content,
+        timeout=timeout,
+    )
+
+
+async def _iter_raw(upstream: httpx.Response) -> AsyncIterator[bytes]:
+    started = time.perf_counter()
+    try:
+        async for chunk in upstream.aiter_raw():
+            yield chunk
+        gateway_metrics.observe("body", time.perf_counter() - started)
+    finally:
+        await upstream.aclose()
+
+
+def streaming_response(upstream: httpx.Response) -> StreamingResponse:
+    """Relay an open upstream response chunk by chunk, still encoded."""
+    response = StreamingResponse(_iter_raw(upstream), status_code=upstream.status_code)
+    response.raw_headers = filter_response_headers(upstream)
+    return response
+
+
+def buffered_response(upstream: httpx.Response) -> Response:
+    """Build a response from an upstream body that has already been read.
+
+    ``httpx`` hands back the decoded body, so the upstream's encoding and
+    length headers are replaced with ones matching ``upstream.content``.
+    """
+    response = Response(content=upstream.content, status_code=upstream.status_code)
+    response.raw_headers = response.raw_headers + filter_response_headers(
+        upstream, drop=("content-length", "content-encoding")
+    )
+    return response
@@ -0,0 +1,149 @@
+"""
+Non-blocking token-bucket rate limiting for the gateway.
+
+Each bucket lives in a Redis hash and is refilled/consumed atomically by a Lua
+script, so a check costs a single round trip and concurrent requests cannot
+slip past the limit. When Redis is unreachable the gateway falls back to
+per-process buckets until Redis recovers.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from .auth import authenticate, user_id_of
+from .core.config import settings
+from .core.redis import redis_client
+
+logger = logging.getLogger("api_gateway.rate_limit")
+
+# KEYS[1] = bucket key; ARGV = refill rate (tokens/s), capacity, cost.
+# Uses the Redis clock so every gateway replica agrees on refill time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+@dataclass(slots=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: int
+    retry_after: int
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated: float
+
+
+class LocalTokenBuckets:
+    """Bounded in-process token buckets used while Redis is unavailable."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    def take(
+        self, key: str, rate: float, capacity: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        """Consume ``cost`` tokens; return ``(allowed, remaining_tokens)``."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(tokens=capacity, updated=now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+        if bucket.tokens < cost:
+            return False, bucket.tokens
+        bucket.tokens -= cost
+        return True, bucket.tokens
+
+
+class RateLimiter:
+    """Token-bucket limiter keyed by route and caller identity."""
+
+    def __init__(self) -> None:
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._local = LocalTokenBuckets(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+        self._redis_retry_at = 0.0
+
+    @staticmethod
+    def identity(request: Request) -> str:
+        """Verified callers are limited per user; everyone else per IP.
+
+        Unverified bearer strings are ignored, so minting fake tokens does not
+        buy fresh buckets.
+        """
+        claims = authenticate(request)
+        user_id = user_id_of(claims) if claims else None
+        if user_id is not None:
+            return f"user:{user_id}"
+        client_ip = request.client.host if request.client else "unknown"
+        return f"ip:{client_ip}"
+
+    @staticmethod
+    def limits_for(rate_class: str) -> Tuple[float, float]:
+        """Return ``(tokens per second, capacity)`` for a route's rate class."""
+        per_minute, burst = settings.RATE_LIMIT_CLASSES.get(
+            rate_class, (settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST)
+        )
+        return per_minute / 60.0, float(burst)
+
+    async def _take_redis(self, key: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        allowed, remaining = await self._script(keys=[key], args=[rate, capacity, 1])
+        return bool(int(allowed)), float(remaining)
+
+    async def check(
+        self, request: Request, route_prefix: str, rate_class: str = "default"
+    ) -> RateLimitDecision:
+        rate, capacity = self.limits_for(rate_class)
+        key = f"rate_limit:{route_prefix}:{self.identity(request)}"
+        allowed = None
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                allowed, remaining = await self._take_redis(key, rate, capacity)
+            except (RedisError, OSError) as exc:
+                logger.warning("Redis rate limiter unavailable, using local buckets: %s", exc)
+                self._redis_retry_at = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+        if allowed is None:
+            allowed, remaining = self._local.take(key, rate, capacity)
+        return RateLimitDecision(
+            allowed=allowed,
+            remaining=int(remaining),
+            retry_after=0 if allowed else max(1, math.ceil((1.0 - remaining) / rate)),
+        )
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,303 @@
+"""
+Compiled, segment-based route table for the gateway.
+
+Routes are compiled into a trie keyed by path segment, so matching costs
+O(path depth) and ``/api/v1/friendsX`` no longer matches ``/api/v1/friends``.
+Every node carries a fully-resolved :class:`Route` (service plus per-route
+policy) inherited from its ancestors at compile time, so nothing is merged
+on the request path.
+
+The table is built from the ``*_SERVICE_URL`` / ``ROUTE_TIMEOUTS`` /
+``CACHE_TTLS`` / ``COALESCE_EXCLUDE`` settings and, optionally, a JSON file
+(``GATEWAY_ROUTES_FILE``) that is hot-reloaded when it changes::
+
+    {
+      "services": {"game-catalog-service": "http://catalog-1:8002,http://catalog-2:8002"},
+      "routes": [
+        {"prefix": "/api/v1/catalog", "service": "game-catalog-service", "timeout": 10},
+        {"prefix": "/api/v1/catalog/games/*", "cache_ttl": 60, "rate_class": "browse"}
+      ]
+    }
+
+A ``*`` segment matches any single segment; exact segments take precedence.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional
+
+from .balancer import ReplicaSet, health_checker
+from .concurrency import PRIORITIES
+from .core.config import settings
+
+logger = logging.getLogger("api_gateway.routing")
+
+WILDCARD = "*"
+
+# Service routing configuration: prefix -> (service name, replica URLs)
+DEFAULT_SERVICE_ROUTES = {
+    "/api/v1/users": ("user-service", settings.USER_SERVICE_URL),
+    "/api/v1/catalog": ("game-catalog-service", settings.GAME_CATALOG_SERVICE_URL),
+    "/api/v1/reviews": ("review-service", settings.REVIEW_SERVICE_URL),
+    "/api/v1/shopping": ("shopping-service", settings.SHOPPING_SERVICE_URL),
+    "/api/v1/purchases": ("purchase-service", settings.PURCHASE_SERVICE_URL),
+    "/api/v1/payments": ("payment-service", settings.PAYMENT_SERVICE_URL),
+    "/api/v1/online": ("online-service", settings.ONLINE_SERVICE_URL),
+    "/api/v1/social": ("social-service", settings.SOCIAL_SERVICE_URL),
+    "/api/v1/notifications": ("notification-service", settings.NOTIFICATION_SERVICE_URL),
+    "/api/v1/recommendations": ("recommendation-service", settings.RECOMMENDATION_SERVICE_URL),
+    "/api/v1/achievements": ("achievement-service", settings.ACHIEVEMENT_SERVICE_URL),
+    "/api/v1/friends": ("friends-chat-service", settings.FRIENDS_CHAT_SERVICE_URL),
+}
+
+
+class RouteConfigError(ValueError):
+    """Raised when a route configuration cannot be compiled."""
+
+
+@dataclass(frozen=True, slots=True)
+class RoutePolicy:
+    timeout: Optional[float] = None
+    cache_ttl: Optional[float] = None
+    coalesce: bool = True
+    stream: bool = True
+    auth: str = "optional"  # optional | required
+    rate_class: str = "default"
+    priority: str = "normal"  # critical | high | normal | low
+    # Idempotent GETs only: hedge past the route's p95, retry failures.
+    hedge: bool = False
+    retries: int = 0
+
+
+_POLICY_FIELDS = frozenset(field.name for field in fields(RoutePolicy))
+
+_NUMBER = (int, float)
+# Accepted JSON types per policy option; ``None`` resets an inherited value.
+_POLICY_TYPES: Dict[str, tuple] = {
+    "timeout": (*_NUMBER, type(None)),
+    "cache_ttl": (*_NUMBER, type(None)),
+    "coalesce": (bool,),
+    "stream": (bool,),
+    "auth": (str,),
+    "rate_class": (str,),
+    "priority": (str,),
+    "hedge": (bool,),
+    "retries": (int,),
+}
+
+
+def _check_policy(prefix: str, spec: Dict[str, Any]) -> None:
+    for key, value in spec.items():
+        expected = _POLICY_TYPES.get(key)
+        if expected is None:
+            continue
+        # bool is an int subclass: reject ``true`` where a number is expected.
+        if not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected):
+            raise RouteConfigError(f"Route {prefix} has invalid {key} {value!r}")
+        if key in ("timeout", "cache_ttl", "retries") and value is not None and value < 0:
+            raise RouteConfigError(f"Route {prefix} has negative {key} {value!r}")
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    prefix: str
+    service: ReplicaSet
+    policy: RoutePolicy
+
+
+class _Node:
+    __slots__ = ("children", "overrides", "route")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.overrides: Dict[str, Any] = {}
+        self.route: Optional[Route] = None
+
+
+def _segments(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+class RouteTable:
+    def __init__(
+        self, services: Dict[str, ReplicaSet], routes: Iterable[Dict[str, Any]]
+    ) -> None:
+        self.services = services
+        self._root = _Node()
+        self._prefixes: List[str] = []
+        for spec in routes:
+            self._insert(spec)
+        self._resolve(self._root, "", {"policy": {}})
+
+    def _insert(self, spec: Dict[str, Any]) -> None:
+        if not isinstance(spec, dict):
+            raise RouteConfigError(f"Route entries must be objects: {spec!r}")
+        prefix = spec.get("prefix")
+        if not isinstance(prefix, str) or not prefix.startswith("/"):
+            raise RouteConfigError(f"Route prefix must be an absolute path: {prefix!r}")
+        unknown = set(spec) - _POLICY_FIELDS - {"prefix", "service"}
+        if unknown:
+            raise RouteConfigError(f"Unknown route options for {prefix}: {sorted(unknown)}")
+        _check_policy(prefix, spec)
+        if spec.get("auth", "optional") not in ("optional", "required"):
+            raise RouteConfigError(f"Route {prefix} has invalid auth {spec['auth']!r}")
+        if spec.get("priority", "normal") not in PRIORITIES:
+            raise RouteConfigError(f"Route {prefix} has invalid priority {spec['priority']!r}")
+        service = spec.get("service")
+        if service is not None and (not isinstance(service, str) or service not in self.services):
+            raise RouteConfigError(f"Route {prefix} references unknown service {service!r}")
+
+        node = self._root
+        for segment in _segments(prefix):
+            node = node.children.setdefault(segment, _Node())
+        node.overrides.update({key: value for key, value in spec.items() if key != "prefix"})
+        if service is not None and prefix not in self._prefixes:
+            self._prefixes.append(prefix)
+
+    def _resolve(self, node: _Node, prefix: str, inherited: Dict[str, Any]) -> None:
+        service = node.overrides.get("service", inherited.get("service"))
+        policy = {
+            **inherited["policy"],
+            **{key: value for key, value in node.overrides.items() if key in _POLICY_FIELDS},
+        }
+        if service is not None:
+            node.route = Route(
+                prefix=prefix or "/",
+                service=self.services[service],
+                policy=RoutePolicy(**policy),
+            )
+        for segment, child in node.children.items():
+            self._resolve(child, f"{prefix}/{segment}", {"service": service, "policy": policy})
+
+    def match(self, path: str) -> Optional[Route]:
+        """Longest matching route for ``path``, by whole segments."""
+        node = self._root
+        best = node.route
+        for segment in _segments(path):
+            child = node.children.get(segment) or node.children.get(WILDCARD)
+            if child is None:
+                break
+            node = child
+            if node.route is not None:
+                best = node.route
+        return best
+
+    @property
+    def service_prefixes(self) -> List[str]:
+        return list(self._prefixes)
+
+
+def _policy_defaults() -> List[Dict[str, Any]]:
+    routes: List[Dict[str, Any]] = [
+        {"prefix": prefix, "service": name, "stream": settings.PROXY_STREAMING}
+        for prefix, (name, _) in DEFAULT_SERVICE_ROUTES.items()
+    ]
+    routes += [{"prefix": p, "timeout": t} for p, t in settings.ROUTE_TIMEOUTS.items()]
+    routes += [{"prefix": p, "cache_ttl": t} for p, t in settings.CACHE_TTLS.items()]
+    routes += [{"prefix": p, "coalesce": False} for p in settings.COALESCE_EXCLUDE]
+    routes += [{"prefix": p, "priority": c} for p, c in settings.ROUTE_PRIORITIES.items()]
+    routes += [{"prefix": p, "hedge": True} for p in settings.HEDGE_ROUTES]
+    routes += [{"prefix": p, "retries": int(n)} for p, n in settings.ROUTE_RETRIES.items()]
+    return routes
+
+
+def _load_file(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError) as exc:
+        raise RouteConfigError(f"Cannot read route config {path}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise RouteConfigError(f"Route config {path} must be a JSON object")
+    return data
+
+
+def build_route_table(previous: Optional[RouteTable] = None) -> RouteTable:
+    """Compile the route table from settings plus the optional routes file.
+
+    Replica sets whose URLs are unchanged are carried over from ``previous``
+    so load-balancing and health state survive a reload.
+    """
+    service_urls = {name: urls for name, urls in DEFAULT_SERVICE_ROUTES.values()}
+    routes = _policy_defaults()
+    if settings.GATEWAY_ROUTES_FILE:
+        data = _load_file(settings.GATEWAY_ROUTES_FILE)
+        file_services = data.get("services") or {}
+        file_routes = data.get("routes") or []
+        if not isinstance(file_services, dict) or not isinstance(file_routes, list):
+            raise RouteConfigError(
+                f"Route config {settings.GATEWAY_ROUTES_FILE} needs a services object "
+                "and a routes list"
+            )
+        for name, urls in file_services.items():
+            if not isinstance(urls, str) or not urls.strip():
+                raise RouteConfigError(f"Service {name} needs a comma-separated URL string")
+        service_urls.update(file_services)
+        routes += file_routes
+
+    services: Dict[str, ReplicaSet] = {}
+    for name, urls in service_urls.items():
+        existing = previous.services.get(name) if previous else None
+        candidate = ReplicaSet(name, urls)
+        services[name] = (
+            existing if existing is not None and existing.urls == candidate.urls else candidate
+        )
+    return RouteTable(services, routes)
+
+
+class RouteRegistry:
+    """Holds the active route table and swaps it atomically on reload."""
+
+    def __init__(self) -> None:
+        self.table = build_route_table()
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    def reload(self) -> RouteTable:
+        table = build_route_table(self.table)
+        self.table = table
+        health_checker.track(table.services.values())
+        logger.info("Loaded %d service routes", len(table.service_prefixes))
+        return table
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(settings.GATEWAY_ROUTES_FILE).st_mtime
+        except OSError:
+            return None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(settings.GATEWAY_ROUTES_RELOAD_INTERVAL)
+            mtime = self._file_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                self.reload()
+            except RouteConfigError as exc:
+                logger.error("Keeping previous routes, reload failed: %s", exc)
+            except Exception:
+                # Never let one bad edit stop hot reload for good.
+                logger.exception("Keeping previous routes, reload failed")
+
+    def start(self) -> None:
+        if settings.GATEWAY_ROUTES_FILE:
+            self._mtime = self._file_mtime()
+            if self._watcher is None and settings.GATEWAY_ROUTES_RELOAD_INTERVAL > 0:
+                self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+
+
+routes = RouteRegistry()
@@ -0,0 +1,23 @@
+"""
+API Gateway Pydantic Schemas
+"""
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+
+class CachePurgeRequest(BaseModel):
+    prefixes: List[str] = Field(..., min_length=1)
+
+
+class BatchItem(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(..., pattern=r"^/")
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+
+class BatchResult(BaseModel):
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
@@ -0,0 +1,67 @@
+"""
+Long-lived HTTP client pools for the gateway's upstream services.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from .core.config import settings
+
+
+class UpstreamPool:
+    """One keep-alive ``httpx.AsyncClient`` per upstream base URL.
+
+    Clients are created once at startup and reused by every proxied call so
+    requests skip TCP/TLS setup. HTTP/2 is only negotiated (via ALPN) against
+    TLS upstreams; plain ``http://`` services keep using HTTP/1.1 keep-alive.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self, base_url: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            http2=settings.UPSTREAM_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.UPSTREAM_TIMEOUT,
+                connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+                pool=settings.UPSTREAM_POOL_TIMEOUT,
+            ),
+        )
+
+    async def start(self, base_urls: Iterable[str]) -> None:
+        for base_url in base_urls:
+            if base_url not in self._clients:
+                self._clients[base_url] = self._build_client(base_url)
+
+    def client_for(self, base_url: str) -> httpx.AsyncClient:
+        client = self._clients.get(base_url)
+        if client is None:
+            # Upstreams added after startup still get a pooled client.
+            client = self._clients[base_url] = self._build_client(base_url)
+        return client
+
+    @staticmethod
+    def timeout_for(seconds: Optional[float]) -> httpx.Timeout:
+        """Return the read/write timeout for a route policy's override."""
+        return httpx.Timeout(
+            settings.UPSTREAM_TIMEOUT if seconds is None else seconds,
+            connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+            pool=settings.UPSTREAM_POOL_TIMEOUT,
+        )
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+upstreams = UpstreamPool()
@@ -0,0 +1,131 @@
+"""
+WebSocket proxying for online-service lobby channels.
+
+Connections are routed to an online-service replica by rendezvous hashing on
+the lobby id, so every member of a lobby lands on the same node and shares
+its Redis subscription. Frames are pumped in both directions by two tasks;
+each side only reads its next frame once the previous one has been written
+to the other, and the upstream client's receive queue is bounded, so a slow
+peer applies backpressure instead of growing gateway buffers.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Dict, Optional
+
+import websockets
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+from websockets.exceptions import ConnectionClosed, InvalidHandshake, InvalidStatusCode
+
+from .auth import identity_headers
+from .balancer import ReplicaSet
+from .circuit_breaker import circuit_breakers
+from .core.config import settings
+
+logger = logging.getLogger("api_gateway.websocket_proxy")
+
+# Close codes: 1008 policy violation (rate limited), 1011 internal error,
+# 1013 try again later (no replica available).
+_FORWARDED_HEADERS = ("authorization", "cookie", "origin", "user-agent")
+
+
+def websocket_url(base_url: str, path: str, query: str) -> str:
+    scheme, sep, rest = base_url.partition("://")
+    ws_scheme = "wss" if scheme == "https" else "ws"
+    url = f"{ws_scheme}{sep}{rest}{path}"
+    return f"{url}?{query}" if query else url
+
+
+def _upstream_headers(websocket: WebSocket) -> Dict[str, str]:
+    headers = {
+        name: websocket.headers[name]
+        for name in _FORWARDED_HEADERS
+        if name in websocket.headers
+    }
+    headers.update(identity_headers(websocket))
+    return headers
+
+
+async def _client_to_upstream(websocket: WebSocket, upstream) -> None:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            await upstream.close(code=message.get("code") or 1000)
+            return
+        if message.get("text") is not None:
+            await upstream.send(message["text"])
+        elif message.get("bytes") is not None:
+            await upstream.send(message["bytes"])
+
+
+async def _upstream_to_client(websocket: WebSocket, upstream) -> None:
+    with contextlib.suppress(ConnectionClosed):
+        async for data in upstream:
+            if isinstance(data, str):
+                await websocket.send_text(data)
+            else:
+                await websocket.send_bytes(data)
+    if websocket.application_state is WebSocketState.CONNECTED:
+        await websocket.close(code=upstream.close_code or 1000)
+
+
+async def proxy_websocket(
+    websocket: WebSocket, replica_set: ReplicaSet, path: str, sticky_key: str
+) -> None:
+    replica = replica_set.pick_sticky(sticky_key)
+    if replica is None:
+        await websocket.close(code=1013)
+        return
+
+    breaker = circuit_breakers.get(replica.url)
+    started = time.perf_counter()
+    try:
+        upstream = await websockets.connect(
+            websocket_url(replica.url, path, websocket.url.query),
+            extra_headers=_upstream_headers(websocket),
+            open_timeout=settings.WS_OPEN_TIMEOUT,
+            ping_interval=settings.WS_PING_INTERVAL,
+            max_size=settings.WS_MAX_MESSAGE_BYTES,
+            max_queue=settings.WS_MAX_QUEUE,
+            write_limit=settings.WS_WRITE_LIMIT,
+        )
+    except InvalidStatusCode as exc:
+        # The upstream refused the handshake (unknown lobby, not a member):
+        # refuse the client's the same way.
+        breaker.record(exc.status_code < 500, time.perf_counter() - started)
+        await websocket.close()
+        return
+    except (InvalidHandshake, OSError, asyncio.TimeoutError) as exc:
+        breaker.record(False, time.perf_counter() - started)
+        logger.warning("WebSocket upstream %s unreachable: %s", replica.url, exc)
+        await websocket.close(code=1013)
+        return
+    breaker.record(True, time.perf_counter() - started)
+
+    await websocket.accept()
+    replica.outstanding += 1
+    pumps = [
+        asyncio.create_task(_client_to_upstream(websocket, upstream)),
+        asyncio.create_task(_upstream_to_client(websocket, upstream)),
+    ]
+    try:
+        done, pending = await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error: Optional[BaseException] = task.exception()
+            if error is not None and not isinstance(error, ConnectionClosed):
+                logger.warning("WebSocket proxy for %s failed: %r", path, error)
+    finally:
+        replica.outstanding -= 1
+        for task in pumps:
+            task.cancel()
+        for task in pumps:
+            with contextlib.suppress(BaseException):
+                await task
+        await upstream.close()
+        if websocket.application_state is WebSocketState.CONNECTED:
+            with contextlib.suppress(Exception):
+                await websocket.close(code=1011 if upstream.close_code is None else 1000)
@@ -1,6 +1,12 @@
 """JWT helpers for Friends & Chat service."""
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
 from typing import Any, Dict
 
 from fastapi import Depends, HTTPException, Request, status
@@ -8,6 +14,8 @@ from jose import JWTError, jwt
 
 from .core.config import settings
 
+GATEWAY_IDENTITY_HEADER = "X-Gateway-Identity"
+
 
 def decode_token(token: str) -> Dict[str, Any]:
     try:
@@ -19,7 +27,32 @@ def decode_token(token: str) -> Dict[str, Any]:
     return payload
 
 
+# Keep identical to services/user-service/app/core/auth.py; api-gateway signs with sign_identity().
+def claims_from_gateway(request: Request) -> Dict[str, Any] | None:
+    """Return claims the API gateway already verified, if signed correctly."""
+    raw_value = request.headers.get(GATEWAY_IDENTITY_HEADER)
+    if not raw_value:
+        return None
+    payload, _, signature = raw_value.rpartition(".")
+    expected = hmac.new(
+        settings.GATEWAY_IDENTITY_SECRET.encode(), payload.encode(), hashlib.sha256
+    ).hexdigest()
+    if not payload or not hmac.compare_digest(signature, expected):
+        return None
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (ValueError, binascii.Error):
+        return None
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)) and exp <= time.time():
+        return None
+    return claims
+
+
 def get_current_user_id(request: Request) -> str:
+    claims = claims_from_gateway(request)
+    if claims is not None and "sub" in claims:
+        return str(claims["sub"])
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
@@ -21,6 +21,10 @@ class Settings:
 
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me")
     ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    # Shared with the API gateway, which signs verified claims with it.
+    GATEWAY_IDENTITY_SECRET: str = os.getenv(
+        "GATEWAY_IDENTITY_SECRET", os.getenv("SECRET_KEY", "change-me")
+    )
 
     ALLOWED_ORIGINS: List[str] = field(
         default_factory=lambda: _parse_allowed_origins(os.getenv("ALLOWED_ORIGINS"))
@@ -1,9 +1,10 @@
 """Catalog endpoints."""
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
@@ -11,7 +12,9 @@ from app.schemas import (
     GameCreate,
     GameResponse,
     GameSearchFilters,
+    GameSearchParams,
     GameSearchResponse,
+    GameSuggestion,
     GameUpdate,
     GenreCreate,
     GenreResponse,
@@ -20,11 +23,14 @@ from app.schemas import (
     TagCreate,
     TagResponse,
 )
-from app.services import CatalogService
+from app.repository.game_repository import FACETS
+from app.services import CatalogService, suggest_index
 from app.utils.exceptions import ConflictError, NotFoundError, ServiceError
 
 router = APIRouter()
 
+_FACET_NAMES = "|".join(FACETS)
+
 
 async def get_catalog_service(
     session: AsyncSession = Depends(get_session),
@@ -32,6 +38,18 @@ async def get_catalog_service(
     return CatalogService(session)
 
 
+async def get_search_filters(
+    params: GameSearchParams = Depends(),
+    genres: Optional[List[int]] = Query(None),
+    tags: Optional[List[int]] = Query(None),
+    platforms: Optional[List[int]] = Query(None),
+) -> GameSearchFilters:
+    # List fields of a model dependency would be read from the request body.
+    return GameSearchFilters(
+        **params.model_dump(), genres=genres, tags=tags, platforms=platforms
+    )
+
+
 def _http_error(exc: ServiceError) -> HTTPException:
     if isinstance(exc, NotFoundError):
         return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
@@ -52,29 +70,90 @@ async def create_game(
 
 @router.get("/games", response_model=GameSearchResponse)
 async def search_games(
-    filters: GameSearchFilters = Depends(),
+    filters: GameSearchFilters = Depends(get_search_filters),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page; takes precedence over page"
+    ),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$"),
+    facets: Optional[str] = Query(
+        None,
+        pattern=f"^({_FACET_NAMES})(,({_FACET_NAMES}))*$",
+        description="Comma-separated facets to count: " + ", ".join(FACETS),
+    ),
     service: CatalogService = Depends(get_catalog_service),
 ):
-    games, total = await service.search(filters, page, per_page)
-    total_pages = max(1, (total + per_page - 1) // per_page)
+    requested = list(dict.fromkeys(facets.split(","))) if facets else []
+    try:
+        result = await service.search(
+            filters, page, per_page, cursor=cursor, count=count, facets=requested
+        )
+    except ServiceError as exc:
+        raise _http_error(exc)
+    total_pages = None
+    if result.total is not None:
+        total_pages = max(1, (result.total + per_page - 1) // per_page)
     return GameSearchResponse(
-        games=games,
-        total=total,
+        games=result.games,
+        total=result.total,
+        total_estimated=result.total_estimated,
         page=page,
         per_page=per_page,
         total_pages=total_pages,
+        next_cursor=result.next_cursor,
+        facets=(
+            {name: [item._asdict() for item in items] for name, items in result.facets.items()}
+            if result.facets is not None
+            else None
+        ),
         filters_applied=filters,
     )
 
 
+# Static /games/... paths are registered before /games/{game_id}, which
+# would otherwise capture them as ids.
+@router.get("/games/featured", response_model=List[GameResponse])
+async def get_featured_games(
+    limit: int = Query(10, ge=1, le=50),
+    service: CatalogService = Depends(get_catalog_service),
+):
+    return await service.featured_games(limit)
+
+
+@router.get("/games/new-releases", response_model=List[GameResponse])
+async def get_new_releases(
+    limit: int = Query(10, ge=1, le=50),
+    service: CatalogService = Depends(get_catalog_service),
+):
+    return await service.new_releases(limit)
+
+
+@router.get("/games/on-sale", response_model=List[GameResponse])
+async def get_on_sale_games(
+    limit: int = Query(10, ge=1, le=50),
+    service: CatalogService = Depends(get_catalog_service),
+):
+    return await service.on_sale(limit)
+
+
+@router.get("/games/suggest", response_model=List[GameSuggestion])
+async def suggest_games(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+):
+    """Search-as-you-type suggestions, served from memory without the database."""
+    return [suggestion._asdict() for suggestion in suggest_index.suggest(q, limit)]
+
+
 @router.get("/games/{game_id}", response_model=GameResponse)
 async def get_game(game_id: int, service: CatalogService = Depends(get_catalog_service)):
     try:
-        return await service.get_game(game_id)
+        payload = await service.get_game_detail(game_id)
     except ServiceError as exc:
         raise _http_error(exc)
+    # Already a GameResponse dump: send it as is instead of validating it again.
+    return JSONResponse(payload)
 
 
 @router.put("/games/{game_id}", response_model=GameResponse)
@@ -100,30 +179,6 @@ async def delete_game(
         raise _http_error(exc)
 
 
-@router.get("/games/featured", response_model=List[GameResponse])
-async def get_featured_games(
-    limit: int = Query(10, ge=1, le=50),
-    service: CatalogService = Depends(get_catalog_service),
-):
-    return await service.featured_games(limit)
-
-
-@router.get("/games/new-releases", response_model=List[GameResponse])
-async def get_new_releases(
-    limit: int = Query(10, ge=1, le=50),
-    service: CatalogService = Depends(get_catalog_service),
-):
-    return await service.new_releases(limit)
-
-
-@router.get("/games/on-sale", response_model=List[GameResponse])
-async def get_on_sale_games(
-    limit: int = Query(10, ge=1, le=50),
-    service: CatalogService = Depends(get_catalog_service),
-):
-    return await service.on_sale(limit)
-
-
 @router.post("/genres", response_model=GenreResponse, status_code=status.HTTP_201_CREATED)
 async def create_genre(
     payload: GenreCreate,
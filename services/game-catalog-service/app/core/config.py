@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 
 def _parse_origins(raw: str | None) -> List[str]:
@@ -27,6 +27,51 @@ class Settings:
         default_factory=lambda: _parse_origins(os.getenv("ALLOWED_ORIGINS"))
     )
 
+    # ---------- REDIS ----------
+    # Optional: shared tier for shelves and caches; in-process only when unset.
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL") or None
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25"))
+    # After a Redis error, skip it for this long and serve from memory.
+    REDIS_RETRY_SECONDS: float = float(os.getenv("REDIS_RETRY_SECONDS", "5"))
+
+    # ---------- SEARCH ----------
+    # Postgres text search configuration used by the games GIN index.
+    SEARCH_TEXT_CONFIG: str = os.getenv("SEARCH_TEXT_CONFIG", "english")
+    # In-process index (SQLite): most relevant matches passed on to SQL filters.
+    SEARCH_MAX_MATCHES: int = int(os.getenv("SEARCH_MAX_MATCHES", "1000"))
+    # Longest prefix indexed for suggestions; longer input is matched by scan.
+    SUGGEST_MAX_PREFIX: int = int(os.getenv("SUGGEST_MAX_PREFIX", "20"))
+    # Full rebuild interval; picks up writes made by other worker processes.
+    SUGGEST_REFRESH_SECONDS: float = float(os.getenv("SUGGEST_REFRESH_SECONDS", "60"))
+
+    # ---------- SNAPSHOT ----------
+    # Serve search from an in-memory columnar copy of the catalog.
+    CATALOG_SNAPSHOT_ENABLED: bool = os.getenv("CATALOG_SNAPSHOT_ENABLED", "false").lower() == "true"
+    # Full reload interval; picks up writes made by other worker processes.
+    CATALOG_SNAPSHOT_REFRESH_SECONDS: float = float(
+        os.getenv("CATALOG_SNAPSHOT_REFRESH_SECONDS", "300")
+    )
+
+    # ---------- SHELVES ----------
+    # Games kept per featured / new-releases / on-sale shelf (endpoint max).
+    SHELF_SIZE: int = int(os.getenv("SHELF_SIZE", "50"))
+    SHELF_REFRESH_SECONDS: float = float(os.getenv("SHELF_REFRESH_SECONDS", "60"))
+
+    # ---------- GAME CACHE ----------
+    # Game detail payloads kept in the per-worker LRU.
+    GAME_CACHE_SIZE: int = int(os.getenv("GAME_CACHE_SIZE", "10000"))
+    # Backstop for invalidations missed by a worker (e.g. Redis unset or down).
+    GAME_CACHE_LOCAL_TTL_SECONDS: float = float(os.getenv("GAME_CACHE_LOCAL_TTL_SECONDS", "30"))
+    GAME_CACHE_TTL_SECONDS: int = int(os.getenv("GAME_CACHE_TTL_SECONDS", "3600"))
+
+    # ---------- FACETS ----------
+    # Upper bounds of the paid price buckets; "free" and "<last>+" are implicit.
+    FACET_PRICE_BUCKETS: List[float] = field(
+        default_factory=lambda: [
+            float(edge) for edge in os.getenv("FACET_PRICE_BUCKETS", "5,10,20,40").split(",")
+        ]
+    )
+
 
 settings = Settings()
 
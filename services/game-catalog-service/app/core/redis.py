@@ -0,0 +1,20 @@
+"""
+Shared asyncio Redis client for catalog caches; ``None`` when REDIS_URL is unset.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+redis_client: Optional[aioredis.Redis] = (
+    aioredis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+    if settings.REDIS_URL
+    else None
+)
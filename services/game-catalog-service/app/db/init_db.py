@@ -1,6 +1,8 @@
 """Database initialization helpers for the game-catalog service."""
 from __future__ import annotations
 
+from sqlalchemy import text
+
 from app.db.base import Base
 from app.db.session import engine
 
@@ -8,5 +10,10 @@ from app.db.session import engine
 async def init_db() -> None:
     """Create database tables if they do not exist."""
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
-
+        # create_all skips new indexes of tables that already exist.
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
@@ -1,14 +1,23 @@
 """
 Game Catalog Service Main Application
 """
+import asyncio
+import contextlib
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app import routes  # re-exported router
 from app.core.config import settings
+from app.core.redis import redis_client
 from app.db.init_db import init_db
+from app.db.session import AsyncSessionLocal, engine
 from app.models import *  # noqa: F401  (register models)
+from app.services import CatalogService
+from app.services.game_cache import game_cache
+from app.services.shelves import shelf_cache
 
 # Create FastAPI app
 app = FastAPI(
@@ -19,6 +28,8 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+logger = logging.getLogger("game_catalog.main")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +48,57 @@ app.include_router(routes.router, prefix="/api/v1/catalog", tags=["catalog"])
 @app.on_event("startup")
 async def on_startup():
     await init_db()
+    async with AsyncSessionLocal() as session:
+        service = CatalogService(session)
+        await service.rebuild_suggest_index()
+        if engine.dialect.name != "postgresql":
+            # No native full-text search: serve text queries from memory.
+            await service.rebuild_search_index()
+        if settings.CATALOG_SNAPSHOT_ENABLED:
+            await service.refresh_snapshot()
+    await shelf_cache.rebuild()
+
+    app.state.background_tasks = [
+        asyncio.create_task(_every(settings.SHELF_REFRESH_SECONDS, shelf_cache.rebuild, "Shelf")),
+        asyncio.create_task(
+            _every(settings.SUGGEST_REFRESH_SECONDS, _rebuild_suggest_index, "Suggest index")
+        ),
+    ]
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        app.state.background_tasks.append(
+            asyncio.create_task(
+                _every(settings.CATALOG_SNAPSHOT_REFRESH_SECONDS, _refresh_snapshot, "Catalog snapshot")
+            )
+        )
+    if redis_client is not None:
+        app.state.background_tasks.append(asyncio.create_task(game_cache.listen()))
+
+
+async def _rebuild_suggest_index():
+    async with AsyncSessionLocal() as session:
+        await CatalogService(session).rebuild_suggest_index()
+
+
+async def _refresh_snapshot():
+    async with AsyncSessionLocal() as session:
+        await CatalogService(session).refresh_snapshot()
+
+
+async def _every(seconds: float, job, name: str):
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await job()
+        except Exception:
+            logger.exception("%s refresh failed; serving the previous one", name)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for task in getattr(app.state, "background_tasks", []):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
 
 @app.get("/health")
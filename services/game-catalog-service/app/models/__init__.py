@@ -1,6 +1,8 @@
 """ORM exports."""
 
 from .game import (
+    GAME_SEARCH_INDEXES,
+    GAME_SEARCH_VECTOR,
     AgeRating,
     Game,
     GameAchievement,
@@ -13,9 +15,14 @@ from .game import (
     Genre,
     Platform,
     Tag,
+    game_genres,
+    game_platforms,
+    game_tags,
 )
 
 __all__ = [
+    "GAME_SEARCH_INDEXES",
+    "GAME_SEARCH_VECTOR",
     "Game",
     "GameAchievement",
     "GameBundle",
@@ -28,5 +35,8 @@ __all__ = [
     "Genre",
     "Tag",
     "Platform",
+    "game_genres",
+    "game_tags",
+    "game_platforms",
 ]
 
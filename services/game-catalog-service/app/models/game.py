@@ -6,6 +6,7 @@ from enum import Enum as PyEnum
 
 from sqlalchemy import (
     ARRAY,
+    JSON,
     Boolean,
     Column,
     DateTime,
@@ -16,13 +17,22 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    literal_column,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.types import Uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
+from app.core.config import settings
 from app.db.base import Base
 
+# Postgres column types, with portable fallbacks so the service also runs on
+# SQLite (local development, load tests).
+_JSON = JSONB().with_variant(JSON(), "sqlite")
+_STRING_LIST = ARRAY(String).with_variant(JSON(), "sqlite")
+_UUID = UUID(as_uuid=True).with_variant(Uuid(), "sqlite")
+
 
 class GameStatus(PyEnum):
     ACTIVE = "active"
@@ -48,11 +58,14 @@ class AgeRating(PyEnum):
     RATING_PENDING = "rating_pending"
 
 
+# Association tables: the primary key serves lookups by game, the second
+# index the catalog filters that start from a genre, tag or platform.
 game_genres = Table(
     "game_genres",
     Base.metadata,
     Column("game_id", Integer, ForeignKey("games.id"), primary_key=True),
     Column("genre_id", Integer, ForeignKey("genres.id"), primary_key=True),
+    Index("idx_game_genres_genre_id", "genre_id", "game_id"),
 )
 
 game_tags = Table(
@@ -60,6 +73,7 @@ game_tags = Table(
     Base.metadata,
     Column("game_id", Integer, ForeignKey("games.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    Index("idx_game_tags_tag_id", "tag_id", "game_id"),
 )
 
 game_platforms = Table(
@@ -67,6 +81,7 @@ game_platforms = Table(
     Base.metadata,
     Column("game_id", Integer, ForeignKey("games.id"), primary_key=True),
     Column("platform_id", Integer, ForeignKey("platforms.id"), primary_key=True),
+    Index("idx_game_platforms_platform_id", "platform_id", "game_id"),
 )
 
 
@@ -74,7 +89,7 @@ class Game(Base):
     __tablename__ = "games"
 
     id = Column(Integer, primary_key=True, index=True)
-    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, index=True)
+    uuid = Column(_UUID, default=uuid.uuid4, unique=True, index=True)
     steam_app_id = Column(Integer, unique=True, index=True, nullable=True)
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
@@ -95,12 +110,12 @@ class Game(Base):
     header_image_url = Column(String(500), nullable=True)
     background_image_url = Column(String(500), nullable=True)
     capsule_image_url = Column(String(500), nullable=True)
-    screenshots = Column(ARRAY(String), nullable=True)
-    movies = Column(ARRAY(String), nullable=True)
+    screenshots = Column(_STRING_LIST, nullable=True)
+    movies = Column(_STRING_LIST, nullable=True)
 
-    pc_requirements = Column(JSONB, nullable=True)
-    mac_requirements = Column(JSONB, nullable=True)
-    linux_requirements = Column(JSONB, nullable=True)
+    pc_requirements = Column(_JSON, nullable=True)
+    mac_requirements = Column(_JSON, nullable=True)
+    linux_requirements = Column(_JSON, nullable=True)
 
     single_player = Column(Boolean, default=False, nullable=False)
     multiplayer = Column(Boolean, default=False, nullable=False)
@@ -124,7 +139,7 @@ class Game(Base):
         nullable=False,
     )
 
-    metadata_json = Column(JSONB, nullable=True)
+    metadata_json = Column(_JSON, nullable=True)
 
     genres = relationship("Genre", secondary=game_genres, back_populates="games")
     tags = relationship("Tag", secondary=game_tags, back_populates="games")
@@ -142,6 +157,51 @@ class Game(Base):
     )
 
 
+def _weighted(weight: str, *columns):
+    text = columns[0]
+    for column in columns[1:]:
+        text = text.op("||")(literal_column("' '")).op("||")(column)
+    return func.setweight(
+        func.to_tsvector(literal_column(f"'{settings.SEARCH_TEXT_CONFIG}'"), text),
+        literal_column(f"'{weight}'"),
+    )
+
+
+def _text(name: str):
+    # Literal rather than bound '' so queries match the index expression.
+    return func.coalesce(Game.__table__.c[name], literal_column("''"))
+
+
+# Weighted full-text document: title (A), developer and publisher (B), short
+# description (C), description (D). Postgres only; queries must use this
+# exact expression for the planner to pick the GIN index.
+GAME_SEARCH_VECTOR = (
+    _weighted("A", _text("title"))
+    .op("||")(_weighted("B", _text("developer"), _text("publisher")))
+    .op("||")(_weighted("C", _text("short_description")))
+    .op("||")(_weighted("D", _text("description")))
+)
+
+# Both indexes are Postgres only: the GIN over the weighted document, and a
+# trigram GIN on title for typo-tolerant matches (needs the pg_trgm extension,
+# created by init_db).
+GAME_SEARCH_INDEXES = (
+    Index(
+        "idx_games_search_vector",
+        GAME_SEARCH_VECTOR,
+        postgresql_using="gin",
+        _table=Game.__table__,
+    ).ddl_if(dialect="postgresql"),
+    Index(
+        "idx_games_title_trgm",
+        Game.__table__.c.title,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+        _table=Game.__table__,
+    ).ddl_if(dialect="postgresql"),
+)
+
+
 class Genre(Base):
     __tablename__ = "genres"
 
@@ -1,21 +1,144 @@
 """Data access helpers for games."""
 from __future__ import annotations
 
-from typing import List, Optional, Sequence, Tuple
-
-from sqlalchemy import asc, desc, func, or_, select
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Select,
+    String,
+    and_,
+    case,
+    cast,
+    desc,
+    exists,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, selectinload
 
+from app.core.config import settings
 from app.models import (
+    GAME_SEARCH_VECTOR,
     Game,
     GameStatus,
     Genre,
     Platform,
     Tag,
+    game_genres,
+    game_platforms,
+    game_tags,
+)
+from app.repository.keyset import (
+    Explain,
+    SortKey,
+    decode_cursor,
+    encode_cursor,
+    keyset_predicate,
 )
 from app.schemas import GameSearchFilters
 
+# Relationships serialised with every game; loaded up front because lazy
+# loads are not available on an AsyncSession.
+_GAME_RELATIONS = (
+    selectinload(Game.genres),
+    selectinload(Game.tags),
+    selectinload(Game.platforms),
+)
+
+
+def _has_links(association, column: str, ids: List[int], mode: str):
+    """Semi-join on an association table: no join fan-out, no DISTINCT.
+
+    "any" is one EXISTS over the listed ids; "all" is one EXISTS per id,
+    each a primary-key probe on (game_id, <column>).
+    """
+    def linked(*targets):
+        return exists().where(
+            association.c.game_id == Game.id, association.c[column].in_(targets)
+        )
+
+    unique = list(dict.fromkeys(ids))
+    if mode == "all":
+        return and_(*(linked(target) for target in unique))
+    return linked(*unique)
+
+
+FACETS = ("genres", "tags", "platforms", "price", "features")
+
+FEATURE_FLAGS = (
+    "single_player",
+    "multiplayer",
+    "co_op",
+    "local_co_op",
+    "cross_platform",
+    "vr_support",
+    "early_access",
+)
+
+
+def _price_bucket(price):
+    """CASE expression naming a price's bucket: free, 0-5, 5-10, ..., 40+."""
+    edges = settings.FACET_PRICE_BUCKETS
+    whens = [(price <= 0, "free")]
+    lower = 0.0
+    for edge in edges:
+        whens.append((price < edge, f"{lower:g}-{edge:g}"))
+        lower = edge
+    return case(*whens, else_=f"{lower:g}+")
+
+
+def price_bucket_order() -> List[str]:
+    lower, order = 0.0, ["free"]
+    for edge in settings.FACET_PRICE_BUCKETS:
+        order.append(f"{lower:g}-{edge:g}")
+        lower = edge
+    return order + [f"{lower:g}+"]
+
+
+class FacetCount(NamedTuple):
+    value: str
+    label: Optional[str]
+    count: int
+
+
+class SearchPage(NamedTuple):
+    games: List[Game]
+    total: Optional[int]
+    total_estimated: bool
+    next_cursor: Optional[str]
+    facets: Optional[Dict[str, List[FacetCount]]] = None
+
+
+def sort_keys(
+    filters: GameSearchFilters, relevance: Optional[List[SortKey]]
+) -> List[SortKey]:
+    """Active sort, always ending with the id so keys are unique."""
+    descending = filters.sort_order != "asc"
+    if filters.sort_by == "price":
+        keys = [SortKey(Game.price, descending)]
+    elif filters.sort_by == "rating":
+        keys = [SortKey(Game.average_rating, descending, nullable=True)]
+    elif filters.sort_by == "release_date":
+        keys = [SortKey(Game.release_date, descending, nullable=True, is_datetime=True)]
+    elif filters.sort_by == "title":
+        keys = [SortKey(Game.title, descending, is_text=True)]
+    elif relevance is not None:
+        keys = relevance
+    else:
+        keys = [
+            SortKey(Game.average_rating, True, nullable=True),
+            SortKey(Game.total_reviews, True),
+        ]
+        descending = True
+    return keys + [SortKey(Game.id, descending)]
+
 
 class GameRepository:
     def __init__(self, session: AsyncSession) -> None:
@@ -23,13 +146,7 @@ class GameRepository:
 
     async def get_by_id(self, game_id: int) -> Optional[Game]:
         result = await self.session.execute(
-            select(Game)
-            .options(
-                selectinload(Game.genres),
-                selectinload(Game.tags),
-                selectinload(Game.platforms),
-            )
-            .where(Game.id == game_id)
+            select(Game).options(*_GAME_RELATIONS).where(Game.id == game_id)
         )
         return result.scalar_one_or_none()
 
@@ -40,18 +157,48 @@ class GameRepository:
         return result.scalar_one_or_none()
 
     async def list(
-        self, skip: int = 0, limit: int = 100
+        self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
     ) -> Sequence[Game]:
+        """Games by id; ``after_id`` continues a listing without an OFFSET."""
+        stmt = select(Game).options(*_GAME_RELATIONS).order_by(Game.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(Game.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def all_with_relations(self) -> Sequence[Game]:
+        result = await self.session.execute(select(Game).options(*_GAME_RELATIONS))
+        return result.scalars().all()
+
+    async def search_documents(self) -> Sequence:
+        """Id and text columns of every game, for the in-process search index."""
         result = await self.session.execute(
-            select(Game)
-            .options(
-                selectinload(Game.genres),
+            select(
+                Game.id,
+                Game.title,
+                Game.developer,
+                Game.publisher,
+                Game.short_description,
+                Game.description,
+            )
+        )
+        return result.all()
+
+    async def suggest_documents(self) -> Sequence[Game]:
+        """Games with just the fields the suggestion index reads."""
+        result = await self.session.execute(
+            select(Game).options(
+                load_only(
+                    Game.id,
+                    Game.title,
+                    Game.developer,
+                    Game.total_reviews,
+                    Game.playtime_2weeks,
+                ),
                 selectinload(Game.tags),
-                selectinload(Game.platforms),
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Game.id)
         )
         return result.scalars().all()
 
@@ -67,12 +214,13 @@ class GameRepository:
     async def featured(self, limit: int) -> List[Game]:
         stmt = (
             select(Game)
+            .options(*_GAME_RELATIONS)
             .where(
                 Game.status == GameStatus.ACTIVE.value,
                 Game.average_rating >= 4.0,
                 Game.total_reviews >= 100,
             )
-            .order_by(desc(Game.average_rating))
+            .order_by(desc(Game.average_rating), desc(Game.id))
             .limit(limit)
         )
         result = await self.session.execute(stmt)
@@ -81,11 +229,12 @@ class GameRepository:
     async def new_releases(self, limit: int) -> List[Game]:
         stmt = (
             select(Game)
+            .options(*_GAME_RELATIONS)
             .where(
                 Game.status == GameStatus.ACTIVE.value,
                 Game.release_date.isnot(None),
             )
-            .order_by(desc(Game.release_date))
+            .order_by(desc(Game.release_date), desc(Game.id))
             .limit(limit)
         )
         result = await self.session.execute(stmt)
@@ -94,38 +243,57 @@ class GameRepository:
     async def on_sale(self, limit: int) -> List[Game]:
         stmt = (
             select(Game)
+            .options(*_GAME_RELATIONS)
             .where(
                 Game.status == GameStatus.ACTIVE.value,
                 Game.discount_percent > 0,
             )
-            .order_by(desc(Game.discount_percent))
+            .order_by(desc(Game.discount_percent), desc(Game.id))
             .limit(limit)
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def search(
-        self, filters: GameSearchFilters, page: int, per_page: int
-    ) -> Tuple[List[Game], int]:
-        stmt = select(Game).distinct()
-
-        if filters.query:
-            term = f"%{filters.query}%"
+    def _filtered(
+        self, filters: GameSearchFilters, text_matches: Optional[List[int]]
+    ) -> Tuple[Select, Optional[List[SortKey]]]:
+        """Select of the games matching ``filters``, plus relevance sort keys."""
+        stmt = select(Game)
+        relevance = None
+
+        if text_matches is not None:
+            stmt = stmt.where(Game.id.in_(text_matches))
+            if text_matches:
+                position = case(
+                    {game_id: position for position, game_id in enumerate(text_matches)},
+                    value=Game.id,
+                )
+                relevance = [SortKey(position, descending=False)]
+        elif filters.query:
+            query = func.websearch_to_tsquery(
+                literal_column(f"'{settings.SEARCH_TEXT_CONFIG}'"), filters.query
+            )
+            # Stemmed, weighted match on the GIN-indexed document, or a
+            # trigram match on the title for misspelled words.
             stmt = stmt.where(
                 or_(
-                    Game.title.ilike(term),
-                    Game.description.ilike(term),
-                    Game.developer.ilike(term),
-                    Game.publisher.ilike(term),
+                    GAME_SEARCH_VECTOR.op("@@")(query),
+                    literal(filters.query).op("<%")(Game.title),
                 )
             )
-
-        if filters.genres:
-            stmt = stmt.join(Game.genres).where(Genre.id.in_(filters.genres))
-        if filters.tags:
-            stmt = stmt.join(Game.tags).where(Tag.id.in_(filters.tags))
-        if filters.platforms:
-            stmt = stmt.join(Game.platforms).where(Platform.id.in_(filters.platforms))
+            relevance = [
+                SortKey(func.ts_rank_cd(GAME_SEARCH_VECTOR, query), descending=True),
+                SortKey(func.word_similarity(filters.query, Game.title), descending=True),
+                SortKey(Game.total_reviews, descending=True),
+            ]
+
+        for association, column, ids, mode in (
+            (game_genres, "genre_id", filters.genres, filters.genres_match),
+            (game_tags, "tag_id", filters.tags, filters.tags_match),
+            (game_platforms, "platform_id", filters.platforms, filters.platforms_match),
+        ):
+            if ids:
+                stmt = stmt.where(_has_links(association, column, ids, mode))
 
         if filters.min_price is not None:
             stmt = stmt.where(Game.price >= filters.min_price)
@@ -152,30 +320,133 @@ class GameRepository:
         if filters.age_rating:
             stmt = stmt.where(Game.age_rating == filters.age_rating.value)
 
-        if filters.sort_by == "price":
-            order = asc if filters.sort_order == "asc" else desc
-            stmt = stmt.order_by(order(Game.price))
-        elif filters.sort_by == "rating":
-            order = asc if filters.sort_order == "asc" else desc
-            stmt = stmt.order_by(order(Game.average_rating))
-        elif filters.sort_by == "release_date":
-            order = asc if filters.sort_order == "asc" else desc
-            stmt = stmt.order_by(order(Game.release_date))
-        elif filters.sort_by == "title":
-            order = asc if filters.sort_order == "asc" else desc
-            stmt = stmt.order_by(order(Game.title))
-        else:
-            stmt = stmt.order_by(desc(Game.average_rating), desc(Game.total_reviews))
+        return stmt, relevance
 
-        count_stmt = (
-            select(func.count(func.distinct(Game.id))).select_from(stmt.subquery())
-        )
-        total = (await self.session.execute(count_stmt)).scalar_one()
+    async def _count(self, stmt: Select, estimate: bool) -> Tuple[int, bool]:
+        """Exact total of ``stmt``'s rows, or the planner's estimate on Postgres."""
+        stmt = stmt.order_by(None)
+        if estimate and self.session.bind.dialect.name == "postgresql":
+            plan = (await self.session.execute(Explain(stmt))).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"]), True
+        count_stmt = stmt.with_only_columns(func.count(), maintain_column_froms=True)
+        return (await self.session.execute(count_stmt)).scalar_one(), False
 
-        offset = (page - 1) * per_page
-        stmt = stmt.offset(offset).limit(per_page)
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all()), total
+    async def search(
+        self,
+        filters: GameSearchFilters,
+        page: int,
+        per_page: int,
+        text_matches: Optional[List[int]] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact",
+    ) -> SearchPage:
+        """One page of filtered, sorted games.
+
+        ``text_matches`` are ids already matched against ``filters.query`` by
+        the in-process index, most relevant first; without them the query is
+        run against the Postgres full-text index.
+
+        With a ``cursor`` the page continues after the row it was issued for
+        (keyset pagination) and ``page`` is ignored. ``count`` is ``exact``,
+        ``estimate`` (planner estimate, Postgres only) or ``none``; a total
+        carried by the cursor is reused rather than recounted.
+        """
+        stmt, relevance = self._filtered(filters, text_matches)
+        keys = sort_keys(filters, relevance)
+        labels = [key.expression.label(f"sort_{i}") for i, key in enumerate(keys)]
+
+        total, estimated = None, False
+        if cursor is not None:
+            after = decode_cursor(cursor, filters, keys)
+            total, estimated = after.total, after.total_estimated
+        elif count != "none":
+            total, estimated = await self._count(stmt, estimate=count == "estimate")
+
+        # Sort keys are selected and read back to build the next cursor.
+        stmt = stmt.add_columns(*labels).order_by(
+            *(key.order_by(label) for key, label in zip(keys, labels))
+        )
+        if cursor is not None:
+            stmt = stmt.where(keyset_predicate(keys, after.values))
+        else:
+            stmt = stmt.offset((page - 1) * per_page)
+        stmt = stmt.options(*_GAME_RELATIONS).limit(per_page + 1)
+        rows = (await self.session.execute(stmt)).all()
+
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            last = rows[-1]
+            next_cursor = encode_cursor(filters, keys, list(last[1:]), total, estimated)
+        return SearchPage([row[0] for row in rows], total, estimated, next_cursor)
+
+    async def facet_counts(
+        self,
+        filters: GameSearchFilters,
+        facets: Sequence[str],
+        text_matches: Optional[List[int]] = None,
+    ) -> Dict[str, List[FacetCount]]:
+        """Counts per genre, tag, platform, price bucket and feature flag.
+
+        Counted over the games matching ``filters`` (facet selections
+        included), in one UNION ALL query over a shared CTE of the matches.
+        """
+        stmt, _ = self._filtered(filters, text_matches)
+        matched = stmt.with_only_columns(
+            Game.id, Game.price, *(getattr(Game, flag) for flag in FEATURE_FLAGS)
+        ).cte("matched")
+
+        def facet(name: str, value, label, *, source=matched, where=None, group=True):
+            part = select(
+                literal_column(f"'{name}'").label("facet"),
+                cast(value, String).label("value"),
+                label.label("label"),
+                func.count().label("count"),
+            ).select_from(source)
+            if where is not None:
+                part = part.where(where)
+            return part.group_by(value, label) if group else part
+
+        parts = []
+        for name, model, association, column, label in (
+            ("genres", Genre, game_genres, "genre_id", Genre.name),
+            ("tags", Tag, game_tags, "tag_id", Tag.name),
+            ("platforms", Platform, game_platforms, "platform_id", Platform.display_name),
+        ):
+            if name in facets:
+                source = matched.join(association, association.c.game_id == matched.c.id).join(
+                    model, model.id == association.c[column]
+                )
+                parts.append(facet(name, model.id, label, source=source))
+        if "price" in facets:
+            parts.append(facet("price", _price_bucket(matched.c.price), cast(null(), String)))
+        if "features" in facets:
+            for flag in FEATURE_FLAGS:
+                # Without GROUP BY the aggregate also reports zero counts.
+                parts.append(
+                    facet(
+                        "features",
+                        literal_column(f"'{flag}'"),
+                        cast(null(), String),
+                        where=matched.c[flag].is_(True),
+                        group=False,
+                    )
+                )
+        if not parts:
+            return {}
+
+        counts: Dict[str, List[FacetCount]] = {name: [] for name in facets}
+        for row in await self.session.execute(union_all(*parts)):
+            counts[row.facet].append(FacetCount(row.value, row.label, row.count))
+        for name in ("genres", "tags", "platforms"):
+            if name in counts:
+                counts[name].sort(key=lambda item: (-item.count, item.label or ""))
+        if "price" in counts:
+            order = {value: position for position, value in enumerate(price_bucket_order())}
+            counts["price"].sort(key=lambda item: order.get(item.value, len(order)))
+        return counts
 
 
 class GenreRepository:
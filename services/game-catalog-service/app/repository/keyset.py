@@ -0,0 +1,131 @@
+"""Keyset (cursor) pagination helpers for game listings.
+
+A page is continued from the sort-key values of its last row instead of an
+OFFSET, so every page costs an index range scan however deep it is. The
+cursor handed to clients is an opaque, URL-safe token carrying those values,
+a fingerprint of the filters it was issued for and, when one was computed,
+the result total so later pages need not count again.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, false, literal, or_, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.utils.exceptions import InvalidCursorError
+
+
+class SortKey(NamedTuple):
+    expression: Any
+    descending: bool
+    nullable: bool = False
+    is_datetime: bool = False
+    is_text: bool = False
+
+    def accepts(self, value: Any) -> bool:
+        """Whether a decoded cursor value has this key's JSON type."""
+        if value is None:
+            return self.nullable
+        if self.is_datetime or self.is_text:
+            return isinstance(value, str)
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def order_by(self, label):
+        ordered = label.desc() if self.descending else label.asc()
+        # Explicit NULLS LAST so the keyset predicate matches on every dialect.
+        return ordered.nulls_last() if self.nullable else ordered
+
+    def after(self, value):
+        """Rows strictly after ``value`` in this key's direction."""
+        if value is None:
+            return false()
+        past = self.expression < value if self.descending else self.expression > value
+        return or_(past, self.expression.is_(None)) if self.nullable else past
+
+    def equals(self, value):
+        return self.expression.is_(None) if value is None else self.expression == value
+
+
+class Cursor(NamedTuple):
+    values: List[Any]
+    total: Optional[int]
+    total_estimated: bool
+
+
+def keyset_predicate(keys: Sequence[SortKey], values: Sequence[Any]):
+    """(k1, k2, ...) > (v1, v2, ...) under each key's direction and null order."""
+    directions = {key.descending for key in keys}
+    if len(directions) == 1 and not any(key.nullable for key in keys):
+        # Row-value comparison: a single index range scan on Postgres.
+        row = tuple_(*(key.expression for key in keys))
+        after = tuple_(*(literal(value) for value in values))
+        return row < after if keys[0].descending else row > after
+    clauses = []
+    for position, key in enumerate(keys):
+        prefix = [keys[i].equals(values[i]) for i in range(position)]
+        clauses.append(and_(*prefix, key.after(values[position])))
+    return or_(*clauses)
+
+
+def fingerprint(filters) -> str:
+    return hashlib.sha1(filters.model_dump_json().encode()).hexdigest()[:16]
+
+
+def encode_cursor(
+    filters, keys: Sequence[SortKey], values: Sequence[Any], total: Optional[int], estimated: bool
+) -> str:
+    payload = {
+        "f": fingerprint(filters),
+        "v": [
+            value.isoformat() if key.is_datetime and value is not None else value
+            for key, value in zip(keys, values)
+        ],
+        "t": total,
+        "e": estimated,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, filters, keys: Sequence[SortKey]) -> Cursor:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        values = payload["v"]
+        if payload["f"] != fingerprint(filters) or len(values) != len(keys):
+            raise InvalidCursorError("Cursor does not match the current filters or sort")
+        total = payload.get("t")
+        if (
+            not isinstance(values, list)
+            or not all(key.accepts(value) for key, value in zip(keys, values))
+            or not (total is None or (isinstance(total, int) and not isinstance(total, bool)))
+        ):
+            raise InvalidCursorError("Malformed cursor")
+        values = [
+            datetime.fromisoformat(value) if key.is_datetime and value is not None else value
+            for key, value in zip(keys, values)
+        ]
+        return Cursor(values, total, bool(payload.get("e")))
+    except InvalidCursorError:
+        raise
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a select, for planner row estimates."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
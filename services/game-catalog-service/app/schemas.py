@@ -1,10 +1,11 @@
 """
 Game Catalog Service Pydantic Schemas
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+from uuid import UUID
 
 class GameStatusEnum(str, Enum):
     ACTIVE = "active"
@@ -104,7 +105,7 @@ class GameUpdate(BaseModel):
 
 class GameResponse(GameBase):
     id: int
-    uuid: str
+    uuid: UUID
     steam_app_id: Optional[int]
     discount_percent: Optional[float]
     header_image_url: Optional[str]
@@ -120,7 +121,11 @@ class GameResponse(GameBase):
     playtime_2weeks: int
     created_at: datetime
     updated_at: datetime
-    metadata: Optional[Dict[str, Any]] = None
+    # ``Game.metadata`` is SQLAlchemy's table metadata; the column is metadata_json.
+    # Cached payloads (model_dump output) carry it as "metadata" instead.
+    metadata: Optional[Dict[str, Any]] = Field(
+        default=None, validation_alias=AliasChoices("metadata_json", "metadata")
+    )
     genres: List["GenreResponse"] = []
     tags: List["TagResponse"] = []
     platforms: List["PlatformResponse"] = []
@@ -199,11 +204,13 @@ class GameAchievementResponse(GameAchievementBase):
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
-class GameSearchFilters(BaseModel):
+class GameSearchParams(BaseModel):
+    """Scalar search parameters; usable directly as a query dependency."""
     query: Optional[str] = None
-    genres: Optional[List[int]] = None
-    tags: Optional[List[int]] = None
-    platforms: Optional[List[int]] = None
+    # "any": at least one of the listed ids; "all": every one of them.
+    genres_match: str = Field(default="any", pattern="^(any|all)$")
+    tags_match: str = Field(default="any", pattern="^(any|all)$")
+    platforms_match: str = Field(default="any", pattern="^(any|all)$")
     min_price: Optional[float] = Field(None, ge=0)
     max_price: Optional[float] = Field(None, ge=0)
     min_rating: Optional[float] = Field(None, ge=0, le=5)
@@ -225,10 +232,31 @@ class GameSearchFilters(BaseModel):
         pattern="^(asc|desc)$",
     )
 
+class GameSearchFilters(GameSearchParams):
+    genres: Optional[List[int]] = None
+    tags: Optional[List[int]] = None
+    platforms: Optional[List[int]] = None
+
+class GameSuggestion(BaseModel):
+    text: str
+    kind: str = Field(..., description="game, developer or tag")
+    game_id: Optional[int] = None
+
+class FacetCount(BaseModel):
+    value: str
+    label: Optional[str] = None
+    count: int
+
 class GameSearchResponse(BaseModel):
     games: List[GameResponse]
-    total: int
+    # None when counting was skipped (count=none).
+    total: Optional[int]
+    total_estimated: bool = False
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int]
+    # Pass back as ``cursor`` to fetch the following page; None on the last.
+    next_cursor: Optional[str] = None
+    # Only the facets requested with ``facets=``, keyed by facet name.
+    facets: Optional[Dict[str, List[FacetCount]]] = None
     filters_applied: GameSearchFilters
\ No newline at end of file
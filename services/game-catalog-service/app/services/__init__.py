@@ -1,7 +1,8 @@
 """Business logic services."""
 
 from .catalog_service import CatalogService
+from .suggest_index import suggest_index
 
-__all__ = ["CatalogService"]
+__all__ = ["CatalogService", "suggest_index"]
 
 
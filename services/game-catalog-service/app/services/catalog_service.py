@@ -1,6 +1,8 @@
 """Business logic for the game catalog."""
 from __future__ import annotations
 
+from typing import Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
@@ -13,6 +15,7 @@ from app.repository.game_repository import (
     GameRepository,
     GenreRepository,
     PlatformRepository,
+    SearchPage,
     TagRepository,
 )
 from app.schemas import (
@@ -23,6 +26,11 @@ from app.schemas import (
     PlatformCreate,
     TagCreate,
 )
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.game_cache import game_cache
+from app.services.search_index import search_index
+from app.services.shelves import shelf_cache
+from app.services.suggest_index import suggest_index
 from app.utils.exceptions import ConflictError, NotFoundError
 
 
@@ -89,7 +97,13 @@ class CatalogService:
 
         await self.games.create(game)
         await self.session.commit()
-        await self.session.refresh(game)
+        if search_index.enabled:
+            search_index.add(game)
+        game = await self.get_game(game.id)
+        suggest_index.add(game)
+        if catalog_snapshot.enabled:
+            catalog_snapshot.upsert(game)
+        shelf_cache.invalidate()
         return game
 
     async def get_game(self, game_id: int) -> Game:
@@ -98,8 +112,15 @@ class CatalogService:
             raise NotFoundError("Game not found")
         return game
 
-    async def list_games(self, skip: int = 0, limit: int = 100):
-        return await self.games.list(skip, limit)
+    async def get_game_detail(self, game_id: int) -> dict:
+        """Serialised game for the detail endpoint, served from the game cache."""
+        game = await game_cache.get(game_id)
+        if game is None:
+            raise NotFoundError("Game not found")
+        return game
+
+    async def list_games(self, skip: int = 0, limit: int = 100, after_id: int | None = None):
+        return await self.games.list(skip, limit, after_id)
 
     async def update_game(self, game_id: int, payload: GameUpdate) -> Game:
         game = await self.get_game(game_id)
@@ -121,27 +142,79 @@ class CatalogService:
             game.discount_percent = 0.0
 
         await self.session.commit()
-        await self.session.refresh(game)
+        await game_cache.invalidate(game_id)
+        if search_index.enabled:
+            search_index.add(game)
+        game = await self.get_game(game.id)
+        suggest_index.add(game)
+        if catalog_snapshot.enabled:
+            catalog_snapshot.upsert(game)
+        shelf_cache.invalidate()
         return game
 
     async def delete_game(self, game_id: int) -> None:
         game = await self.get_game(game_id)
         await self.games.delete(game)
         await self.session.commit()
+        await game_cache.invalidate(game_id)
+        search_index.remove(game_id)
+        suggest_index.remove(game_id)
+        catalog_snapshot.remove(game_id)
+        shelf_cache.invalidate()
 
     async def featured_games(self, limit: int):
-        return await self.games.featured(limit)
+        shelf = await shelf_cache.read("featured", limit)
+        return shelf if shelf is not None else await self.games.featured(limit)
 
     async def new_releases(self, limit: int):
-        return await self.games.new_releases(limit)
+        shelf = await shelf_cache.read("new_releases", limit)
+        return shelf if shelf is not None else await self.games.new_releases(limit)
 
     async def on_sale(self, limit: int):
-        return await self.games.on_sale(limit)
+        shelf = await shelf_cache.read("on_sale", limit)
+        return shelf if shelf is not None else await self.games.on_sale(limit)
 
     async def search(
-        self, filters: GameSearchFilters, page: int, per_page: int
-    ) -> tuple[list[Game], int]:
-        return await self.games.search(filters, page, per_page)
+        self,
+        filters: GameSearchFilters,
+        page: int,
+        per_page: int,
+        cursor: str | None = None,
+        count: str = "exact",
+        facets: Sequence[str] = (),
+    ) -> SearchPage:
+        text_matches = None
+        if filters.query and search_index.enabled:
+            text_matches = search_index.search(filters.query)
+        if catalog_snapshot.can_serve(filters, text_matches):
+            return catalog_snapshot.search(
+                filters, page, per_page, text_matches, cursor=cursor, count=count, facets=facets
+            )
+        result = await self.games.search(
+            filters, page, per_page, text_matches, cursor=cursor, count=count
+        )
+        if facets:
+            result = result._replace(
+                facets=await self.games.facet_counts(filters, facets, text_matches)
+            )
+        return result
+
+    async def rebuild_search_index(self) -> None:
+        """Load every game into the in-process index and switch it on."""
+        search_index.rebuild(await self.games.search_documents())
+        search_index.enabled = True
+
+    async def refresh_snapshot(self) -> None:
+        """Reload the columnar snapshot from the database and switch it on."""
+        catalog_snapshot.begin_load()
+        catalog_snapshot.load(await self.games.all_with_relations())
+        # SQLite compares text byte-wise (BINARY); Postgres uses locale collation.
+        catalog_snapshot.codepoint_titles = self.session.bind.dialect.name == "sqlite"
+        catalog_snapshot.enabled = True
+
+    async def rebuild_suggest_index(self) -> None:
+        suggest_index.begin_rebuild()
+        suggest_index.rebuild(await self.games.suggest_documents())
 
     # ------------------------------------------------------------------ Genres
     async def create_genre(self, payload: GenreCreate) -> Genre:
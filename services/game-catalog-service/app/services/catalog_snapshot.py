@@ -0,0 +1,405 @@
+"""
+Optional in-process columnar snapshot of the catalog for browse and search.
+
+Enabled with ``CATALOG_SNAPSHOT_ENABLED``. Every game is held as one row
+across NumPy columns: price, rating, release date, review counts and
+playtime as numbers (NaN for missing values); feature flags as booleans;
+status, type and age rating as small integer codes; and genres, tags and
+platforms as a packed bitset per game (one bit per label). Filters become
+vectorised boolean masks, sorting is a ``lexsort`` over the matching rows
+(after an ``argpartition`` pre-selection when only the top of the order is
+needed), and facet counts are column sums over the mask. Serialised
+``GameResponse`` payloads are kept alongside, so a search page never touches
+the database.
+
+Ordering, NULL placement and cursors match ``GameRepository.search``, so
+clients see the same pages whether or not the snapshot serves them. Titles
+are ordered by code point, which only SQLite's default BINARY collation
+agrees with, so ``sort_by=title`` is served only when ``codepoint_titles``
+is set and otherwise goes to the database. Text queries are served only when
+the in-process search index is active; otherwise they fall through to
+Postgres.
+
+``CatalogService`` writes update rows in place. Writes made while a reload
+is reading the database are journaled and re-applied on top of it, so the
+reload cannot bring back older rows. Writes from other worker processes are
+picked up by the full reload every ``CATALOG_SNAPSHOT_REFRESH_SECONDS``.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.repository.game_repository import (
+    FEATURE_FLAGS,
+    FacetCount,
+    SearchPage,
+    price_bucket_order,
+    sort_keys,
+)
+from app.repository.keyset import SortKey, decode_cursor, encode_cursor
+from app.schemas import GameResponse, GameSearchFilters
+
+# Numeric columns; NaN marks NULL.
+_NUMERIC = ("price", "average_rating", "release_date", "total_reviews", "playtime_2weeks")
+# Dictionary-encoded string columns; code 0 is NULL.
+_CODED = ("status", "game_type", "age_rating")
+# (dimension, filter mode field, relationship label attribute)
+_LABELS = (
+    ("genres", "genres_match", "name"),
+    ("tags", "tags_match", "name"),
+    ("platforms", "platforms_match", "display_name"),
+)
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class CatalogSnapshot:
+    def __init__(self) -> None:
+        self.enabled = False
+        # Whether the database orders titles by code point, like NumPy does.
+        self.codepoint_titles = False
+        # game id -> game (``None`` once removed) written since ``begin_load``
+        self._journal: Optional[Dict[int, object]] = None
+        self._reset(capacity=1024)
+
+    def _reset(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._size = 0  # high-water mark; rows past it are unused
+        self._rows: Dict[int, int] = {}  # game id -> row
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._numeric = {name: np.full(capacity, np.nan) for name in _NUMERIC}
+        self._flags = {name: np.zeros(capacity, dtype=bool) for name in FEATURE_FLAGS}
+        self._codes = {name: np.zeros(capacity, dtype=np.int16) for name in _CODED}
+        self._code_of: Dict[str, Dict[str, int]] = {name: {} for name in _CODED}
+        self._titles = np.empty(capacity, dtype=object)
+        self._title_rank: Optional[np.ndarray] = None
+        self._bits = {name: np.zeros((capacity, 1), dtype=np.uint8) for name, _, _ in _LABELS}
+        self._bit_of: Dict[str, Dict[int, int]] = {name: {} for name, _, _ in _LABELS}
+        self._label_names: Dict[str, Dict[int, str]] = {name: {} for name, _, _ in _LABELS}
+        self._payloads: List[Optional[GameResponse]] = [None] * capacity
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------------------------------------------------------------------ writes
+    def begin_load(self) -> None:
+        """Start journaling writes; call before reading the games for ``load``."""
+        self._journal = {}
+
+    def load(self, games: Sequence) -> None:
+        """Replace the snapshot with ``games`` (genres, tags and platforms loaded).
+
+        Writes journaled since ``begin_load`` are newer than (or equal to) the
+        rows read, so they are applied again on top.
+        """
+        journal, self._journal = self._journal or {}, None
+        self._reset(capacity=max(1024, 2 * len(games)))
+        for game in games:
+            self._upsert(game)
+        for game_id, game in journal.items():
+            if game is None:
+                self._remove(game_id)
+            else:
+                self._upsert(game)
+
+    def upsert(self, game) -> None:
+        if self._journal is not None:
+            self._journal[game.id] = game
+        self._upsert(game)
+
+    def remove(self, game_id: int) -> None:
+        if self._journal is not None:
+            self._journal[game_id] = None
+        self._remove(game_id)
+
+    def _upsert(self, game) -> None:
+        row = self._rows.get(game.id)
+        if row is None:
+            if self._size == self._capacity:
+                self._grow()
+            row = self._rows[game.id] = self._size
+            self._size += 1
+        self._ids[row] = game.id
+        self._alive[row] = True
+        for name in _NUMERIC:
+            value = getattr(game, name)
+            self._numeric[name][row] = (
+                _epoch(value) if name == "release_date" else (np.nan if value is None else value)
+            )
+        for name in FEATURE_FLAGS:
+            self._flags[name][row] = bool(getattr(game, name))
+        for name in _CODED:
+            value = getattr(game, name)
+            codes = self._code_of[name]
+            self._codes[name][row] = 0 if value is None else codes.setdefault(value, len(codes) + 1)
+        if self._titles[row] != game.title:
+            self._titles[row] = game.title
+            self._title_rank = None
+        for dimension, _, label in _LABELS:
+            self._bits[dimension][row] = 0
+            for item in getattr(game, dimension):
+                self._set_bit(dimension, row, item.id)
+                self._label_names[dimension][item.id] = getattr(item, label)
+        self._payloads[row] = GameResponse.model_validate(game)
+
+    def _remove(self, game_id: int) -> None:
+        row = self._rows.pop(game_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._payloads[row] = None
+        if self._size > 1024 and len(self._rows) < self._size // 2:
+            self._compact()
+
+    def _set_bit(self, dimension: str, row: int, label_id: int) -> None:
+        bits = self._bit_of[dimension]
+        bit = bits.get(label_id)
+        if bit is None:
+            bit = bits[label_id] = len(bits)
+            matrix = self._bits[dimension]
+            if bit >= matrix.shape[1] * 8:
+                self._bits[dimension] = np.hstack(
+                    [matrix, np.zeros((matrix.shape[0], matrix.shape[1]), dtype=np.uint8)]
+                )
+        self._bits[dimension][row, bit // 8] |= np.uint8(1 << (bit % 8))
+
+    def _grow(self) -> None:
+        self._resize(np.arange(self._size), 2 * self._capacity)
+
+    def _compact(self) -> None:
+        self._resize(np.flatnonzero(self._alive[: self._size]), self._capacity)
+
+    def _resize(self, keep: np.ndarray, capacity: int) -> None:
+        """Copy rows ``keep`` (in order) into fresh arrays of ``capacity``."""
+        count = len(keep)
+
+        def moved(array: np.ndarray, fill) -> np.ndarray:
+            fresh = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            fresh[:count] = array[keep]
+            return fresh
+
+        self._ids = moved(self._ids, 0)
+        self._alive = moved(self._alive, False)
+        self._numeric = {name: moved(column, np.nan) for name, column in self._numeric.items()}
+        self._flags = {name: moved(column, False) for name, column in self._flags.items()}
+        self._codes = {name: moved(column, 0) for name, column in self._codes.items()}
+        self._titles = moved(self._titles, None)
+        self._bits = {name: moved(matrix, 0) for name, matrix in self._bits.items()}
+        self._payloads = [self._payloads[row] for row in keep] + [None] * (capacity - count)
+        self._capacity, self._size = capacity, count
+        self._rows = {int(game_id): row for row, game_id in enumerate(self._ids[:count])}
+        self._title_rank = None
+
+    # ------------------------------------------------------------------ reads
+    def can_serve(self, filters: GameSearchFilters, text_matches: Optional[List[int]]) -> bool:
+        if filters.sort_by == "title" and not self.codepoint_titles:
+            return False
+        return self.enabled and (not filters.query or text_matches is not None)
+
+    def _mask(self, filters: GameSearchFilters, text_matches: Optional[List[int]]) -> np.ndarray:
+        size = self._size
+        mask = self._alive[:size].copy()
+        if text_matches is not None:
+            mask &= np.isin(self._ids[:size], text_matches)
+
+        price = self._numeric["price"][:size]
+        rating = self._numeric["average_rating"][:size]
+        # Comparisons with NaN are False, like SQL comparisons with NULL.
+        with np.errstate(invalid="ignore"):
+            if filters.min_price is not None:
+                mask &= price >= filters.min_price
+            if filters.max_price is not None:
+                mask &= price <= filters.max_price
+            if filters.min_rating is not None:
+                mask &= rating >= filters.min_rating
+            if filters.max_rating is not None:
+                mask &= rating <= filters.max_rating
+        for name in ("single_player", "multiplayer", "co_op", "vr_support", "early_access"):
+            wanted = getattr(filters, name)
+            if wanted is not None:
+                mask &= self._flags[name][:size] == wanted
+        for name in _CODED:
+            wanted = getattr(filters, name)
+            if wanted:
+                code = self._code_of[name].get(wanted.value)
+                mask &= self._codes[name][:size] == code if code is not None else False
+
+        for dimension, mode_field, _ in _LABELS:
+            ids = getattr(filters, dimension)
+            if not ids:
+                continue
+            matrix = self._bits[dimension][:size]
+            query = np.zeros(matrix.shape[1], dtype=np.uint8)
+            known = [self._bit_of[dimension][i] for i in set(ids) if i in self._bit_of[dimension]]
+            for bit in known:
+                query[bit // 8] |= np.uint8(1 << (bit % 8))
+            if getattr(filters, mode_field) == "all":
+                if len(known) < len(set(ids)):
+                    mask[:] = False
+                else:
+                    mask &= ((matrix & query) == query).all(axis=1)
+            else:
+                mask &= (matrix & query).any(axis=1)
+        return mask
+
+    def _column(self, key: SortKey, text_matches: Optional[List[int]]) -> np.ndarray:
+        """Raw values of a sort key, comparable with cursor values."""
+        size = self._size
+        name = getattr(key.expression, "key", None)
+        if key.expression is None:
+            positions = {game_id: position for position, game_id in enumerate(text_matches or [])}
+            return np.array(
+                [positions.get(int(game_id), len(positions)) for game_id in self._ids[:size]],
+                dtype=np.int64,
+            )
+        if name == "id":
+            return self._ids[:size]
+        if name == "title":
+            return self._titles[:size]
+        return self._numeric[name][:size]
+
+    def _order_key(self, key: SortKey, values: np.ndarray) -> np.ndarray:
+        """Ascending lexsort key: descending keys negated, NULLs last."""
+        if values.dtype == object:
+            if self._title_rank is None:
+                titles = self._titles[: self._size]
+                rank = np.empty(len(titles), dtype=np.int64)
+                rank[np.argsort(titles.astype(str), kind="stable")] = np.arange(len(titles))
+                self._title_rank = rank
+            values = self._title_rank
+        ordered = -values.astype(np.float64) if key.descending else values.astype(np.float64)
+        ordered[np.isnan(ordered)] = np.inf
+        return ordered
+
+    def _cursor_value(self, key: SortKey, value):
+        if key.is_datetime and value is not None:
+            return _epoch(value)
+        return value
+
+    def _after(self, keys: List[SortKey], columns: List[np.ndarray], values: list) -> np.ndarray:
+        """Vectorised ``keyset_predicate``: rows strictly after the cursor row."""
+        size = self._size
+        result = np.zeros(size, dtype=bool)
+        prefix = np.ones(size, dtype=bool)
+        for key, column, value in zip(keys, columns, values):
+            value = self._cursor_value(key, value)
+            nulls = np.isnan(column) if key.nullable else np.zeros(size, dtype=bool)
+            if value is not None:
+                with np.errstate(invalid="ignore"):
+                    past = column < value if key.descending else column > value
+                    equal = column == value
+                result |= prefix & (np.asarray(past, dtype=bool) | nulls)
+                prefix &= np.asarray(equal, dtype=bool)
+            else:
+                prefix &= nulls
+        return result
+
+    def _top(self, order_keys: List[np.ndarray], rows: np.ndarray, need: int) -> np.ndarray:
+        """The first ``need`` of ``rows`` in sort order."""
+        if need < len(rows) // 4:
+            # Keep only rows that can be in the top ``need`` by the primary key.
+            primary = order_keys[0][rows]
+            kth = np.partition(primary, need - 1)[need - 1]
+            rows = rows[primary <= kth]
+        order = np.lexsort(tuple(key[rows] for key in reversed(order_keys)))
+        return rows[order[:need]]
+
+    def _output_value(self, key: SortKey, column: np.ndarray, row: int):
+        value = column[row]
+        if isinstance(value, str):
+            return value
+        if key.is_datetime:
+            return None if np.isnan(value) else datetime.fromtimestamp(value, timezone.utc)
+        if np.issubdtype(column.dtype, np.floating):
+            return None if np.isnan(value) else float(value)
+        return int(value)
+
+    def search(
+        self,
+        filters: GameSearchFilters,
+        page: int,
+        per_page: int,
+        text_matches: Optional[List[int]] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact",
+        facets: Sequence[str] = (),
+    ) -> SearchPage:
+        """Same contract as ``GameRepository.search``, answered from memory."""
+        relevance = [SortKey(None, descending=False)] if text_matches else None
+        keys = sort_keys(filters, relevance)
+        mask = self._mask(filters, text_matches)
+
+        total, estimated = (int(mask.sum()), False) if count != "none" else (None, False)
+        counts = self._facets(mask, facets) if facets else None
+
+        columns = [self._column(key, text_matches) for key in keys]
+        offset = (page - 1) * per_page
+        if cursor is not None:
+            after = decode_cursor(cursor, filters, keys)
+            total, estimated = after.total, after.total_estimated
+            mask &= self._after(keys, columns, after.values)
+            offset = 0
+
+        rows = np.flatnonzero(mask)
+        need = offset + per_page + 1
+        top = self._top([self._order_key(key, column) for key, column in zip(keys, columns)], rows, need)
+        top = top[offset:]
+
+        next_cursor = None
+        if len(top) > per_page:
+            top = top[:per_page]
+            last = int(top[-1])
+            values = [self._output_value(key, column, last) for key, column in zip(keys, columns)]
+            next_cursor = encode_cursor(filters, keys, values, total, estimated)
+        games = [self._payloads[int(row)] for row in top]
+        return SearchPage(games, total, estimated, next_cursor, counts)
+
+    def _facets(self, mask: np.ndarray, facets: Sequence[str]) -> Dict[str, List[FacetCount]]:
+        counts: Dict[str, List[FacetCount]] = {}
+        for dimension, _, _ in _LABELS:
+            if dimension not in facets:
+                continue
+            bits = self._bit_of[dimension]
+            per_bit = np.unpackbits(
+                self._bits[dimension][: self._size][mask], axis=1, bitorder="little"
+            ).sum(axis=0)
+            names = self._label_names[dimension]
+            items = [
+                FacetCount(str(label_id), names.get(label_id), int(per_bit[bit]))
+                for label_id, bit in bits.items()
+                if per_bit[bit]
+            ]
+            counts[dimension] = sorted(items, key=lambda item: (-item.count, item.label or ""))
+        if "price" in facets:
+            price = self._numeric["price"][: self._size][mask]
+            labels = price_bucket_order()
+            free = price <= 0
+            buckets = np.searchsorted(settings.FACET_PRICE_BUCKETS, price[~free], side="right")
+            per_bucket = np.bincount(buckets, minlength=len(labels) - 1)
+            items = [FacetCount("free", None, int(free.sum()))] if free.any() else []
+            items += [
+                FacetCount(label, None, int(total))
+                for label, total in zip(labels[1:], per_bucket)
+                if total
+            ]
+            counts["price"] = items
+        if "features" in facets:
+            counts["features"] = [
+                FacetCount(flag, None, int(self._flags[flag][: self._size][mask].sum()))
+                for flag in FEATURE_FLAGS
+            ]
+        return counts
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,168 @@
+"""
+Read-through cache of serialised ``GameResponse`` payloads for game detail.
+
+Two tiers: an in-process LRU (``GAME_CACHE_SIZE`` entries, each trusted for
+``GAME_CACHE_LOCAL_TTL_SECONDS``) and, when Redis is configured, a shared
+copy per game that lives for ``GAME_CACHE_TTL_SECONDS``. A hit in either
+tier skips the games query and its three relation loads.
+
+Every Redis payload is stamped with the game's version counter and keys
+carry a hash of the response schema, so a deploy that changes
+``GameResponse`` never reads old payloads. ``update_game`` and
+``delete_game`` bump the version after commit, making any copy written by a
+reader that loaded the old row unusable, and publish the id so other
+workers drop their LRU entry. Misses are single-flight: concurrent requests
+for one game in a worker share one database load.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.repository.game_repository import GameRepository
+from app.schemas import GameResponse
+
+logger = logging.getLogger("game_catalog.game_cache")
+
+_SCHEMA = hashlib.sha1(
+    json.dumps(GameResponse.model_json_schema(), sort_keys=True).encode()
+).hexdigest()[:8]
+GAME_KEY = "catalog:game:" + _SCHEMA + ":{game_id}"
+GAME_VERSION_KEY = "catalog:game:{game_id}:version"
+INVALIDATED_CHANNEL = "catalog:game:invalidated"
+
+Payload = Dict[str, Any]
+
+
+class GameCache:
+    def __init__(self) -> None:
+        # game id -> (expires at, payload), least recently used first
+        self._local: "OrderedDict[int, Tuple[float, Payload]]" = OrderedDict()
+        # game id -> in-flight load shared by concurrent misses
+        self._loading: Dict[int, asyncio.Task] = {}
+        # game id -> local invalidation count; loads that raced one are not kept
+        self._generations: Dict[int, int] = {}
+        self._redis_retry_at = 0.0
+
+    def _redis_available(self) -> bool:
+        return redis_client is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, exc: Exception) -> None:
+        logger.warning("Redis game cache unavailable: %s", exc)
+        self._redis_retry_at = time.monotonic() + settings.REDIS_RETRY_SECONDS
+
+    # ------------------------------------------------------------------ reads
+    async def get(self, game_id: int) -> Optional[Payload]:
+        """The game's ``GameResponse`` payload, or ``None`` if it does not exist."""
+        cached = self._local.get(game_id)
+        if cached is not None:
+            expires_at, payload = cached
+            if time.monotonic() < expires_at:
+                self._local.move_to_end(game_id)
+                return payload
+            del self._local[game_id]
+
+        task = self._loading.get(game_id)
+        if task is None:
+            task = asyncio.create_task(self._load(game_id))
+            self._loading[game_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(game_id, None))
+        # Shielded so one cancelled request does not fail the others waiting.
+        return await asyncio.shield(task)
+
+    async def _load(self, game_id: int) -> Optional[Payload]:
+        generation = self._generations.get(game_id, 0)
+        version = None
+        if self._redis_available():
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(GAME_VERSION_KEY.format(game_id=game_id))
+                    pipe.get(GAME_KEY.format(game_id=game_id))
+                    raw_version, raw_payload = await pipe.execute()
+            except (RedisError, OSError) as exc:
+                self._redis_failed(exc)
+            else:
+                version = int(raw_version or 0)
+                if raw_payload is not None:
+                    stamped = json.loads(raw_payload)
+                    if stamped["version"] == version:
+                        self._remember(game_id, generation, stamped["game"])
+                        return stamped["game"]
+
+        async with AsyncSessionLocal() as session:
+            game = await GameRepository(session).get_by_id(game_id)
+            if game is None:
+                return None
+            payload = GameResponse.model_validate(game).model_dump(mode="json")
+
+        self._remember(game_id, generation, payload)
+        if version is not None and self._redis_available():
+            try:
+                await redis_client.set(
+                    GAME_KEY.format(game_id=game_id),
+                    json.dumps({"version": version, "game": payload}),
+                    ex=settings.GAME_CACHE_TTL_SECONDS,
+                )
+            except (RedisError, OSError) as exc:
+                self._redis_failed(exc)
+        return payload
+
+    def _remember(self, game_id: int, generation: int, payload: Payload) -> None:
+        if self._generations.get(game_id, 0) != generation:
+            return
+        self._local[game_id] = (time.monotonic() + settings.GAME_CACHE_LOCAL_TTL_SECONDS, payload)
+        self._local.move_to_end(game_id)
+        while len(self._local) > settings.GAME_CACHE_SIZE:
+            self._local.popitem(last=False)
+
+    # ------------------------------------------------------------------ writes
+    async def invalidate(self, game_id: int) -> None:
+        """Drop a game from both tiers; call after its write is committed."""
+        self._forget(game_id)
+        if not self._redis_available():
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(GAME_VERSION_KEY.format(game_id=game_id))
+                pipe.delete(GAME_KEY.format(game_id=game_id))
+                pipe.publish(INVALIDATED_CHANNEL, game_id)
+                await pipe.execute()
+        except (RedisError, OSError) as exc:
+            # Other workers keep their copy until it expires.
+            self._redis_failed(exc)
+
+    def _forget(self, game_id: int) -> None:
+        self._local.pop(game_id, None)
+        self._generations[game_id] = self._generations.get(game_id, 0) + 1
+
+    async def listen(self) -> None:
+        """Drop LRU entries for games invalidated by other workers."""
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATED_CHANNEL)
+                    # Writes missed while unsubscribed may have left stale entries.
+                    self._local.clear()
+                    while True:
+                        # Bounded wait: the client's socket timeout is short.
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None:
+                            self._forget(int(message["data"]))
+            except (RedisError, OSError) as exc:
+                logger.warning("Game cache invalidation feed lost: %s", exc)
+                await asyncio.sleep(settings.REDIS_RETRY_SECONDS)
+
+
+game_cache = GameCache()
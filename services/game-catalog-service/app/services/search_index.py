@@ -0,0 +1,211 @@
+"""
+In-process full-text index over game text, for databases without native
+full-text search (SQLite in development and load tests).
+
+Mirrors the Postgres search path: text is lower-cased, split into words,
+stripped of stopwords and stemmed, and every field contributes with the same
+weights as the tsvector (title > developer/publisher > short description >
+description). Matches are ranked with BM25. Every query word must match
+(like ``websearch_to_tsquery``); words of four or more letters also match
+indexed terms one typo away, at a reduced weight.
+
+Typo candidates come from a deletion-neighbourhood map: each indexed term is
+stored under itself and every variant with one character removed, and a query
+term looks up the same variants of itself. Two words that share an entry are
+one substitution, insertion, deletion or adjacent swap apart, and lookups
+stay O(word length) instead of scanning the vocabulary.
+
+The index lives in the worker process: it is built from the database on
+startup and kept current by ``CatalogService`` writes made in that process.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have in is it its of on or that
+    the this to was were will with
+    """.split()
+)
+
+# (field, weight) pairs; weights follow Postgres' default ts_rank weights for
+# the A/B/C/D labels used by GAME_SEARCH_VECTOR.
+_FIELDS = (
+    ("title", 1.0),
+    ("developer", 0.4),
+    ("publisher", 0.4),
+    ("short_description", 0.2),
+    ("description", 0.1),
+)
+
+_FUZZY_MIN_LENGTH = 4
+_FUZZY_WEIGHT = 0.5
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# Longest suffix first; a suffix is only removed when at least three
+# characters remain.
+_SUFFIXES = (
+    ("ational", "ate"),
+    ("ization", "ize"),
+    ("fulness", "ful"),
+    ("ousness", "ous"),
+    ("iveness", "ive"),
+    ("ations", "ate"),
+    ("ation", "ate"),
+    ("ments", ""),
+    ("ment", ""),
+    ("ness", ""),
+    ("ings", ""),
+    ("ing", ""),
+    ("ies", "y"),
+    ("ied", "y"),
+    ("ers", "er"),
+    ("ed", ""),
+    ("ly", ""),
+    ("es", ""),
+    ("s", ""),
+    ("e", ""),
+)
+
+
+def stem(word: str) -> str:
+    """Light suffix-stripping stemmer ("racing", "races", "raced" -> "rac")."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith("ss"):
+                return word
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def _deletions(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        self.enabled = False
+        # term -> {game id: weighted term frequency}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        # game id -> {term: weighted term frequency}, for removal
+        self._documents: Dict[int, Dict[str, float]] = {}
+        self._lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        # term or one-deletion variant -> indexed terms
+        self._neighbours: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    # ------------------------------------------------------------------ writes
+    def add(self, game) -> None:
+        """Index (or re-index) anything with a game's id and text attributes."""
+        self.remove(game.id)
+        terms: Dict[str, float] = defaultdict(float)
+        for field, weight in _FIELDS:
+            for term in tokenize(getattr(game, field, None)):
+                terms[term] += weight
+        if not terms:
+            return
+        for term, frequency in terms.items():
+            postings = self._postings[term]
+            if not postings:
+                self._neighbours[term].add(term)
+                for variant in _deletions(term):
+                    self._neighbours[variant].add(term)
+            postings[game.id] = frequency
+        self._documents[game.id] = dict(terms)
+        self._lengths[game.id] = sum(terms.values())
+        self._total_length += self._lengths[game.id]
+
+    def remove(self, game_id: int) -> None:
+        terms = self._documents.pop(game_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(game_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(game_id, None)
+            if postings:
+                continue
+            del self._postings[term]
+            for variant in _deletions(term) | {term}:
+                neighbours = self._neighbours.get(variant)
+                if neighbours is not None:
+                    neighbours.discard(term)
+                    if not neighbours:
+                        del self._neighbours[variant]
+
+    def rebuild(self, games: Iterable) -> None:
+        self._postings.clear()
+        self._documents.clear()
+        self._lengths.clear()
+        self._neighbours.clear()
+        self._total_length = 0.0
+        for game in games:
+            self.add(game)
+
+    # ------------------------------------------------------------------ reads
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Indexed terms matching a query term, with their match weight."""
+        matches: Dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = 1.0
+        if len(term) >= _FUZZY_MIN_LENGTH:
+            for variant in _deletions(term) | {term}:
+                for candidate in self._neighbours.get(variant, ()):
+                    matches.setdefault(candidate, _FUZZY_WEIGHT)
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Ids of games matching every query word, most relevant first."""
+        limit = limit or settings.SEARCH_MAX_MATCHES
+        terms = tokenize(query)
+        if not terms or not self._documents:
+            return []
+
+        count = len(self._documents)
+        average_length = self._total_length / count
+        scores: Optional[Dict[int, float]] = None
+        for term in dict.fromkeys(terms):
+            term_scores: Dict[int, float] = {}
+            for candidate, weight in self._expand(term).items():
+                postings = self._postings[candidate]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for game_id, frequency in postings.items():
+                    if scores is not None and game_id not in scores:
+                        continue
+                    norm = 1 - _BM25_B + _BM25_B * self._lengths[game_id] / average_length
+                    score = weight * idf * frequency * (_BM25_K1 + 1) / (frequency + _BM25_K1 * norm)
+                    # A game matching several spellings scores its best one.
+                    if score > term_scores.get(game_id, 0.0):
+                        term_scores[game_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {game_id: scores[game_id] + score for game_id, score in term_scores.items()}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [game_id for game_id, _ in ranked[:limit]]
+
+
+search_index = SearchIndex()
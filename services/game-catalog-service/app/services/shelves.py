@@ -0,0 +1,123 @@
+"""
+Precomputed storefront shelves: featured, new releases and on sale.
+
+Each shelf's top ``SHELF_SIZE`` games are computed with the repository's
+shelf queries and stored as serialised ``GameResponse`` payloads, both in
+process and, when Redis is configured, in one sorted set per shelf scored by
+position. A read is a ``ZRANGE 0 k-1`` (or a list slice), O(k), and never
+touches the games table.
+
+Shelves are rebuilt on a schedule (``SHELF_REFRESH_SECONDS``) and after every
+game write, coalesced so a burst of writes costs one rebuild. Rebuilds
+replace the Redis keys in one MULTI transaction, so readers in other workers
+never see a half-written shelf. When Redis is down
+or unset, the in-process copy is served; before the first rebuild, reads
+return ``None`` and callers query the database.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.repository.game_repository import GameRepository
+from app.schemas import GameResponse
+
+logger = logging.getLogger("game_catalog.shelves")
+
+SHELF_KEY = "catalog:shelf:{name}"
+SHELVES_BUILT_KEY = "catalog:shelves:built_at"
+
+
+class ShelfCache:
+    def __init__(self) -> None:
+        self._local: Dict[str, List[Dict[str, Any]]] = {}
+        self._redis_retry_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self._stale = False
+
+    def _redis_available(self) -> bool:
+        return redis_client is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, exc: Exception) -> None:
+        logger.warning("Redis shelf cache unavailable: %s", exc)
+        self._redis_retry_at = time.monotonic() + settings.REDIS_RETRY_SECONDS
+
+    # ------------------------------------------------------------------ reads
+    async def read(self, name: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Top ``limit`` games of a shelf, or ``None`` if it was never built."""
+        if self._redis_available():
+            key = SHELF_KEY.format(name=name)
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.exists(SHELVES_BUILT_KEY)
+                    pipe.zrange(key, 0, limit - 1)
+                    built, members = await pipe.execute()
+            except (RedisError, OSError) as exc:
+                self._redis_failed(exc)
+            else:
+                if built:
+                    return [json.loads(member) for member in members]
+        shelf = self._local.get(name)
+        return shelf[:limit] if shelf is not None else None
+
+    # ------------------------------------------------------------------ writes
+    async def rebuild(self) -> None:
+        async with AsyncSessionLocal() as session:
+            games = GameRepository(session)
+            shelves = {
+                "featured": await games.featured(settings.SHELF_SIZE),
+                "new_releases": await games.new_releases(settings.SHELF_SIZE),
+                "on_sale": await games.on_sale(settings.SHELF_SIZE),
+            }
+        payloads = {
+            name: [GameResponse.model_validate(game).model_dump(mode="json") for game in shelf]
+            for name, shelf in shelves.items()
+        }
+        self._local = payloads
+        if self._redis_available():
+            try:
+                await self._store(payloads)
+            except (RedisError, OSError) as exc:
+                self._redis_failed(exc)
+
+    async def _store(self, payloads: Dict[str, List[Dict[str, Any]]]) -> None:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for name, shelf in payloads.items():
+                key = SHELF_KEY.format(name=name)
+                pipe.delete(key)
+                if shelf:
+                    pipe.zadd(
+                        key, {json.dumps(game): position for position, game in enumerate(shelf)}
+                    )
+            # Distinguishes an empty shelf from one never built.
+            pipe.set(SHELVES_BUILT_KEY, int(time.time()))
+            await pipe.execute()
+
+    def invalidate(self) -> None:
+        """Schedule a rebuild after a game write; bursts share one rebuild."""
+        if self._refresh is not None and not self._refresh.done():
+            self._stale = True
+            return
+        self._refresh = asyncio.create_task(self._rebuild_until_fresh())
+
+    async def _rebuild_until_fresh(self) -> None:
+        while True:
+            self._stale = False
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Shelf rebuild failed; serving the previous shelves")
+                return
+            if not self._stale:
+                return
+
+
+shelf_cache = ShelfCache()
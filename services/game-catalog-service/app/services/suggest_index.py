@@ -0,0 +1,183 @@
+"""
+In-memory prefix index behind search-as-you-type suggestions.
+
+Suggestions are game titles, developers and tag names. Each one is findable
+from the start of any of its words ("leg" finds "Racing Legends"), and is
+ranked by popularity: log(1 + total_reviews) + log(1 + playtime_2weeks) for
+a game, and the score of its most popular game for a developer or tag.
+
+Every prefix (up to ``SUGGEST_MAX_PREFIX`` characters) maps to a list of
+suggestions kept sorted by score, so a lookup is one dict access plus
+reading the first ``limit`` items. Writes re-place only the suggestions of
+the game that changed. The index is built from the database on startup,
+updated by ``CatalogService`` writes made in the same process, and rebuilt
+every ``SUGGEST_REFRESH_SECONDS`` to pick up writes from other processes.
+Writes made while a rebuild reads the database are journaled and applied
+again on top of it.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import re
+from itertools import count
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+GAME, DEVELOPER, TAG = "game", "developer", "tag"
+
+
+class Suggestion(NamedTuple):
+    text: str
+    kind: str
+    game_id: Optional[int]
+
+
+def _normalize(text: Optional[str]) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def popularity(game) -> float:
+    return math.log1p(game.total_reviews or 0) + math.log1p(game.playtime_2weeks or 0)
+
+
+class _Entry:
+    __slots__ = ("seq", "suggestion", "keys", "scores", "slot")
+
+    def __init__(self, seq: int, suggestion: Suggestion) -> None:
+        self.seq = seq
+        self.suggestion = suggestion
+        normalized = _normalize(suggestion.text)
+        words = normalized.split(" ")
+        # Searchable from the start of every word.
+        self.keys = [" ".join(words[i:]) for i in range(len(words))] if normalized else []
+        # Game id -> popularity of each game this entry stands for.
+        self.scores: Dict[int, float] = {}
+        # Sort key of the entry in the prefix lists, while placed.
+        self.slot: Optional[Tuple[float, int]] = None
+
+    def prefixes(self) -> set[str]:
+        limit = settings.SUGGEST_MAX_PREFIX
+        return {key[:end] for key in self.keys for end in range(1, min(len(key), limit) + 1)}
+
+
+class SuggestIndex:
+    def __init__(self) -> None:
+        self._seq = count()
+        # (kind, normalized text or game id) -> entry
+        self._entries: Dict[Tuple[str, object], _Entry] = {}
+        self._by_seq: Dict[int, _Entry] = {}
+        # prefix -> [(-score, seq)] in ascending order, i.e. most popular first
+        self._prefixes: Dict[str, List[Tuple[float, int]]] = {}
+        # game id -> keys of the entries it contributes to
+        self._games: Dict[int, List[Tuple[str, object]]] = {}
+        # game id -> game (``None`` once removed) written since ``begin_rebuild``
+        self._journal: Optional[Dict[int, object]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------ writes
+    def add(self, game) -> None:
+        """Index (or re-index) a game; its ``tags`` must be loaded."""
+        if self._journal is not None:
+            self._journal[game.id] = game
+        self._add(game)
+
+    def remove(self, game_id: int) -> None:
+        if self._journal is not None:
+            self._journal[game_id] = None
+        self._remove(game_id)
+
+    def begin_rebuild(self) -> None:
+        """Start journaling writes; call before reading the games for ``rebuild``."""
+        self._journal = {}
+
+    def rebuild(self, games: Iterable) -> None:
+        journal, self._journal = self._journal or {}, None
+        self._entries.clear()
+        self._by_seq.clear()
+        self._prefixes.clear()
+        self._games.clear()
+        for game in games:
+            self._add(game)
+        for game_id, game in journal.items():
+            if game is None:
+                self._remove(game_id)
+            else:
+                self._add(game)
+
+    def _add(self, game) -> None:
+        self._remove(game.id)
+        score = popularity(game)
+        contributions = [((GAME, game.id), Suggestion(game.title, GAME, game.id))]
+        if game.developer:
+            contributions.append(
+                ((DEVELOPER, _normalize(game.developer)), Suggestion(game.developer, DEVELOPER, None))
+            )
+        for tag in game.tags or ():
+            contributions.append(((TAG, _normalize(tag.name)), Suggestion(tag.name, TAG, None)))
+
+        keys = []
+        for key, suggestion in contributions:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(next(self._seq), suggestion)
+                self._by_seq[entry.seq] = entry
+            entry.scores[game.id] = score
+            self._place(entry)
+            keys.append(key)
+        self._games[game.id] = keys
+
+    def _remove(self, game_id: int) -> None:
+        for key in self._games.pop(game_id, ()):
+            entry = self._entries[key]
+            entry.scores.pop(game_id, None)
+            if entry.scores:
+                self._place(entry)
+                continue
+            self._unplace(entry)
+            del self._entries[key]
+            del self._by_seq[entry.seq]
+
+    def _place(self, entry: _Entry) -> None:
+        slot = (-max(entry.scores.values()), entry.seq)
+        if slot == entry.slot:
+            return
+        self._unplace(entry)
+        for prefix in entry.prefixes():
+            bisect.insort(self._prefixes.setdefault(prefix, []), slot)
+        entry.slot = slot
+
+    def _unplace(self, entry: _Entry) -> None:
+        if entry.slot is None:
+            return
+        for prefix in entry.prefixes():
+            bucket = self._prefixes[prefix]
+            del bucket[bisect.bisect_left(bucket, entry.slot)]
+            if not bucket:
+                del self._prefixes[prefix]
+        entry.slot = None
+
+    # ------------------------------------------------------------------ reads
+    def suggest(self, text: str, limit: int) -> List[Suggestion]:
+        query = _normalize(text)
+        bucket = self._prefixes.get(query[: settings.SUGGEST_MAX_PREFIX]) if query else None
+        if not bucket:
+            return []
+        # Prefixes longer than the indexed ones are checked against the keys.
+        exact = len(query) <= settings.SUGGEST_MAX_PREFIX
+        suggestions: List[Suggestion] = []
+        for _, seq in bucket:
+            entry = self._by_seq[seq]
+            if exact or any(key.startswith(query) for key in entry.keys):
+                suggestions.append(entry.suggestion)
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+
+suggest_index = SuggestIndex()
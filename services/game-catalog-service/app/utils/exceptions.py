@@ -13,3 +13,5 @@ class NotFoundError(ServiceError):
     """Raised when a resource cannot be located."""
 
 
+class InvalidCursorError(ServiceError):
+    """Raised when a pagination cursor is malformed or issued for other filters."""
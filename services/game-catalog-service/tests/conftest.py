@@ -0,0 +1,11 @@
+"""Test setup: a throwaway SQLite catalog, configured before ``app`` is imported."""
+import os
+import sys
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="catalog-tests-")
+os.environ["GAME_CATALOG_DATABASE_URL"] = f"sqlite:///{_DB_DIR}/catalog.db"
+os.environ.pop("REDIS_URL", None)
+os.environ["CATALOG_SNAPSHOT_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+"""Cached game payloads must serialise exactly like the ORM rows they came from."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.seed import seed_games
+from app.services.shelves import shelf_cache
+
+GAMES = "/api/v1/catalog/games"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        client.portal.call(seed_games, 50)
+        client.portal.call(shelf_cache.rebuild)
+        yield client
+
+
+def _seeded(games):
+    seeded = [game for game in games if game["title"].startswith("Sample Game")]
+    assert seeded
+    return seeded
+
+
+def test_shelves_keep_metadata(client):
+    shelf = client.get(f"{GAMES}/new-releases", params={"limit": 20}).json()
+    for game in _seeded(shelf):
+        assert game["metadata"]["support_email"] == "support@example.com"
+
+
+def test_game_detail_matches_uncached_response(client):
+    game_id = _seeded(client.get(GAMES, params={"per_page": 5}).json()["games"])[0]["id"]
+    first, cached = (client.get(f"{GAMES}/{game_id}").json() for _ in range(2))
+    assert first["metadata"]["support_email"] == "support@example.com"
+    assert cached == first
+    # Search pages are not served from the game cache.
+    listed = client.get(GAMES, params={"per_page": 5}).json()["games"]
+    assert next(game for game in listed if game["id"] == game_id) == first
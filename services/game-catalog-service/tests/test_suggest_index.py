@@ -0,0 +1,50 @@
+"""The suggest index follows writes from other processes and survives rebuild races."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import AsyncSessionLocal
+from app.main import _rebuild_suggest_index, app
+from app.models import Game
+from app.repository.game_repository import GameRepository
+from app.services import suggest_index
+
+GAMES = "/api/v1/catalog/games"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _suggested(client, text):
+    return [item["text"] for item in client.get(f"{GAMES}/suggest", params={"q": text}).json()]
+
+
+def test_rebuild_picks_up_writes_from_other_processes(client):
+    async def insert_elsewhere():
+        # Straight to the database, as another worker would.
+        async with AsyncSessionLocal() as session:
+            session.add(
+                Game(title="Quasar Drift", developer="Elsewhere", publisher="Elsewhere", price=3)
+            )
+            await session.commit()
+
+    client.portal.call(insert_elsewhere)
+    assert "Quasar Drift" not in _suggested(client, "quasar")
+    client.portal.call(_rebuild_suggest_index)
+    assert "Quasar Drift" in _suggested(client, "quasar")
+
+
+def test_rebuild_keeps_writes_made_while_reading(client):
+    async def stale_rows():
+        async with AsyncSessionLocal() as session:
+            return await GameRepository(session).suggest_documents()
+
+    suggest_index.begin_rebuild()
+    rows = client.portal.call(stale_rows)
+    game_id = client.post(GAMES, json={"title": "Halcyon Run", "price": 2}).json()["id"]
+    client.put(f"{GAMES}/{game_id}", json={"title": "Halcyon Sprint"})
+    suggest_index.rebuild(rows)
+
+    assert _suggested(client, "halcyon") == ["Halcyon Sprint"]
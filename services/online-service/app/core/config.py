@@ -44,6 +44,8 @@ class Settings:
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     LOBBY_MAX_MEMBERS: int = int(os.getenv("LOBBY_MAX_MEMBERS", "8"))
     LOBBY_MESSAGE_HISTORY_LIMIT: int = int(os.getenv("LOBBY_MESSAGE_HISTORY_LIMIT", "50"))
+    # Per-socket event buffer; sockets that fall further behind are closed.
+    LOBBY_SUBSCRIBER_QUEUE_SIZE: int = int(os.getenv("LOBBY_SUBSCRIBER_QUEUE_SIZE", "256"))
 
     # ---------- KAFKA ----------
     KAFKA_BOOTSTRAP_SERVERS: str = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
@@ -58,11 +58,14 @@ def root():
     return {"message": "Online Service API", "version": "1.0.0"}
 
 
-async def _forward_pubsub(pubsub, websocket: WebSocket) -> None:
-    async for message in pubsub.listen():
-        if message["type"] != "message":
-            continue
-        await websocket.send_text(message["data"])
+async def _forward_events(queue: asyncio.Queue, websocket: WebSocket) -> None:
+    while True:
+        message = await queue.get()
+        if message is None:
+            # Fell too far behind, or the lobby feed was lost; reconnect.
+            await websocket.close(code=1013)
+            return
+        await websocket.send_text(message)
 
 
 @app.websocket("/ws/lobbies/{lobby_id}")
@@ -85,8 +88,8 @@ async def lobby_socket(websocket: WebSocket, lobby_id: str):
             return
 
         await websocket.accept()
-        pubsub = await hub.subscribe(lobby_id)
-        forward_task = asyncio.create_task(_forward_pubsub(pubsub, websocket))
+        events = await hub.join(lobby_id)
+        forward_task = asyncio.create_task(_forward_events(events, websocket))
 
         history = await hub.lobby_history(lobby_id)
         for entry in history:
@@ -124,8 +127,7 @@ async def lobby_socket(websocket: WebSocket, lobby_id: str):
         finally:
             forward_task.cancel()
             with contextlib.suppress(Exception):
-                await pubsub.unsubscribe()
-                await pubsub.close()
+                await hub.leave(lobby_id, events)
     finally:
         session.close()
 
@@ -4,8 +4,10 @@ Redis-backed helpers for lobby broadcasts and message history.
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
-from typing import Any, AsyncIterator, Dict
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set
 
 import redis.asyncio as aioredis
 
@@ -14,12 +16,47 @@ from .core.config import settings
 LOBBY_CHANNEL = "lobby:{lobby_id}:events"
 LOBBY_HISTORY_KEY = "lobby:{lobby_id}:history"
 
+logger = logging.getLogger("online_service.realtime")
+
+
+class _LobbyFanout:
+    """One Redis subscription per lobby, shared by this node's sockets."""
+
+    def __init__(self, pubsub) -> None:
+        self.pubsub = pubsub
+        self.subscribers: Set[asyncio.Queue] = set()
+        # Subscribing; every joiner awaits it, so they all see its outcome.
+        self.starting: Optional[asyncio.Task] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def deliver(self, data: str) -> None:
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Too slow to keep up: cut it loose instead of stalling the lobby.
+                self.subscribers.discard(queue)
+                _end(queue)
+
+    def end_all(self) -> None:
+        """Tell every attached socket the feed is gone."""
+        subscribers, self.subscribers = self.subscribers, set()
+        for queue in subscribers:
+            _end(queue)
+
+
+def _end(queue: asyncio.Queue) -> None:
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(None)
+
 
 class RealtimeHub:
     """Minimal Redis helper for pub/sub + history."""
 
     def __init__(self) -> None:
         self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._lobbies: Dict[str, _LobbyFanout] = {}
 
     async def publish_lobby_event(self, lobby_id: str, payload: Dict[str, Any]) -> None:
         channel = LOBBY_CHANNEL.format(lobby_id=lobby_id)
@@ -34,13 +71,72 @@ class RealtimeHub:
         entries = await self.redis.lrange(history_key, 0, settings.LOBBY_MESSAGE_HISTORY_LIMIT - 1)
         return [json.loads(entry) for entry in reversed(entries)]
 
-    async def subscribe(self, lobby_id: str):
-        channel = LOBBY_CHANNEL.format(lobby_id=lobby_id)
-        pubsub = self.redis.pubsub()
-        await pubsub.subscribe(channel)
-        return pubsub
+    async def join(self, lobby_id: str) -> asyncio.Queue:
+        """Queue of this lobby's events; ``None`` means the reader fell behind
+        or this node lost the lobby's subscription, and should reconnect."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LOBBY_SUBSCRIBER_QUEUE_SIZE)
+        fanout = self._lobbies.get(lobby_id)
+        if fanout is None:
+            fanout = self._lobbies[lobby_id] = _LobbyFanout(self.redis.pubsub())
+            fanout.starting = asyncio.create_task(self._start(lobby_id, fanout))
+        fanout.subscribers.add(queue)
+        try:
+            # Shielded: one joiner giving up must not cancel the others' subscribe.
+            await asyncio.shield(fanout.starting)
+        except BaseException:
+            fanout.subscribers.discard(queue)
+            if not fanout.subscribers and self._lobbies.get(lobby_id) is fanout:
+                await self._drop(lobby_id)
+            raise
+        return queue
+
+    async def _start(self, lobby_id: str, fanout: _LobbyFanout) -> None:
+        try:
+            await fanout.pubsub.subscribe(LOBBY_CHANNEL.format(lobby_id=lobby_id))
+        except Exception:
+            logger.exception("Subscribing to lobby %s failed", lobby_id)
+            await self._fail(lobby_id, fanout)
+            raise
+        fanout.task = asyncio.create_task(self._listen(lobby_id, fanout))
+
+    async def _listen(self, lobby_id: str, fanout: _LobbyFanout) -> None:
+        try:
+            async for message in fanout.pubsub.listen():
+                if message["type"] == "message":
+                    fanout.deliver(message["data"])
+        except Exception:
+            logger.exception("Lobby %s event feed failed", lobby_id)
+            await self._fail(lobby_id, fanout)
+
+    async def _fail(self, lobby_id: str, fanout: _LobbyFanout) -> None:
+        # Unregister first so the next join subscribes afresh.
+        if self._lobbies.get(lobby_id) is fanout:
+            del self._lobbies[lobby_id]
+        fanout.end_all()
+        with contextlib.suppress(Exception):
+            await fanout.pubsub.close()
+
+    async def leave(self, lobby_id: str, queue: asyncio.Queue) -> None:
+        fanout = self._lobbies.get(lobby_id)
+        if fanout is None:
+            return
+        fanout.subscribers.discard(queue)
+        if not fanout.subscribers:
+            await self._drop(lobby_id)
+
+    async def _drop(self, lobby_id: str) -> None:
+        fanout = self._lobbies.pop(lobby_id)
+        # Still subscribing: nobody is left to wait for it.
+        for task in (fanout.starting, fanout.task):
+            if task is not None:
+                task.cancel()
+        with contextlib.suppress(Exception):
+            await fanout.pubsub.unsubscribe()
+            await fanout.pubsub.close()
 
     async def close(self) -> None:
+        for lobby_id in list(self._lobbies):
+            await self._drop(lobby_id)
         await self.redis.close()
 
 
@@ -7,10 +7,16 @@ removal.
 """
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -20,6 +26,8 @@ from .config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=settings.TOKEN_URL)
 
+GATEWAY_IDENTITY_HEADER = "X-Gateway-Identity"
+
 
 def get_password_hash(password: str) -> str:
     """Hash plain text password using bcrypt."""
@@ -44,8 +52,33 @@ def create_access_token(
     return encoded_jwt
 
 
-def verify_token(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+# Keep identical to services/friends-chat-service/app/auth.py; api-gateway signs with sign_identity().
+def claims_from_gateway(request: Request) -> Dict[str, Any] | None:
+    """Return claims the API gateway already verified, if signed correctly."""
+    raw_value = request.headers.get(GATEWAY_IDENTITY_HEADER)
+    if not raw_value:
+        return None
+    payload, _, signature = raw_value.rpartition(".")
+    expected = hmac.new(
+        settings.GATEWAY_IDENTITY_SECRET.encode(), payload.encode(), hashlib.sha256
+    ).hexdigest()
+    if not payload or not hmac.compare_digest(signature, expected):
+        return None
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (ValueError, binascii.Error):
+        return None
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)) and exp <= time.time():
+        return None
+    return claims
+
+
+def verify_token(request: Request, token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     """Decode and validate a JWT token, returning the payload."""
+    claims = claims_from_gateway(request)
+    if claims is not None and "user_id" in claims:
+        return claims
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
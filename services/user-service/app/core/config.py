@@ -47,6 +47,10 @@ class Settings:
     ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     TOKEN_URL: str = os.getenv("TOKEN_URL", "/api/v1/users/login")
+    # Shared with the API gateway, which signs verified claims with it.
+    GATEWAY_IDENTITY_SECRET: str = os.getenv(
+        "GATEWAY_IDENTITY_SECRET", os.getenv("SECRET_KEY", "change-me")
+    )
 
     ALLOWED_ORIGINS: List[str] = field(
         default_factory=lambda: _parse_allowed_origins(os.getenv("ALLOWED_ORIGINS"))